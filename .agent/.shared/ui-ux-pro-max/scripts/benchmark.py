@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Benchmark - Performance harness and regression gate for the search engine
+
+Measures, for the shipped CSVs and synthetic scale-ups (each row replicated N
+times with a variant token so documents stay distinct):
+  - index build time per domain / stack (no on-disk cache)
+  - cold start of search.py (empty and warm index cache)
+  - warm query latency percentiles for search(), search_stack(), search_all()
+    and generate_design_system() (result cache cleared before every call)
+  - peak traced memory of all indexes plus one query run, measured in a
+    separate process so tracemalloc does not slow down the timed runs
+
+Usage:
+    python benchmark.py [--scales 1,10,100] [--repeat 5] [--output bench.json]
+    python benchmark.py --scales 1,10 --compare baseline.json [--threshold 0.25]
+
+--compare exits with status 1 when any metric is slower (or larger) than the
+baseline by more than --threshold (fraction, default 0.25).
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+SCRIPTS_DIR = Path(__file__).parent
+SOURCE_DATA_DIR = SCRIPTS_DIR.parent / "data"
+
+# Fixed query corpus per domain (kept stable so runs are comparable)
+QUERY_CORPUS = {
+    "style": ["glassmorphism dark", "minimal clean", "brutalism bold", "3d immersive", "retro neon gaming"],
+    "prompt": ["glass blur css", "tailwind gradient", "dark mode variables"],
+    "color": ["fintech trust blue", "healthcare calm", "streaming entertainment dark", "ecommerce luxury"],
+    "chart": ["trend over time", "comparison categories", "funnel conversion"],
+    "landing": ["hero video", "pricing comparison", "testimonial social proof"],
+    "product": ["saas dashboard", "video streaming", "crypto exchange", "education platform"],
+    "ux": ["touch target mobile", "keyboard navigation focus", "loading skeleton", "scroll performance"],
+    "typography": ["elegant serif luxury", "modern sans tech", "playful rounded"],
+    "icons": ["navigation arrow", "media play pause", "settings gear"],
+    "react": ["rerender memo", "bundle dynamic import", "waterfall suspense"],
+    "web": ["form input aria", "focus outline", "virtualize long list"],
+}
+STACK_QUERIES = {
+    "flutter": ["list performance", "state management", "focus navigation"],
+    "react": ["memo callback", "form validation"],
+    "html-tailwind": ["responsive grid", "dark mode"],
+}
+FEDERATED_QUERIES = ["dashboard chart colors", "streaming dark video", "accessible form focus"]
+DESIGN_SYSTEM_QUERIES = ["streaming video platform", "saas dashboard", "live tv guide", "fintech mobile app"]
+COLD_START_QUERY = "glassmorphism dark"
+
+# Every gated metric is "lower is better" (time or memory)
+DEFAULT_THRESHOLD = 0.25
+
+
+# ============ SYNTHETIC CORPORA ============
+def build_scaled_data(target_dir: Path, factor: int) -> Path:
+    """Copy the data directory, replicating every CSV row `factor` times."""
+    shutil.copytree(SOURCE_DATA_DIR, target_dir)
+    if factor <= 1:
+        return target_dir
+    for csv_path in target_dir.rglob("*.csv"):
+        with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            rows = list(reader)
+        if not header or not rows:
+            continue
+        with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(header)
+            for variant in range(factor):
+                for row in rows:
+                    # Tag the first column so replicas are distinct documents
+                    writer.writerow([f"{row[0]} variant{variant}"] + row[1:] if variant else row)
+    return target_dir
+
+
+# ============ MEASUREMENTS (run inside a worker process) ============
+def _percentiles(samples_ms: list) -> dict:
+    values = sorted(samples_ms)
+    if not values:
+        return {}
+
+    def pick(pct):
+        return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 4),
+        "p50_ms": round(pick(50), 4),
+        "p95_ms": round(pick(95), 4),
+        "p99_ms": round(pick(99), 4),
+        "max_ms": round(values[-1], 4),
+    }
+
+
+def _timed(fn, repeat: int, before=None) -> list:
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_worker(repeat: int, trace_memory: bool = False) -> dict:
+    """Measure the engine against UI_PRO_MAX_DATA_DIR in this process.
+
+    With trace_memory, everything runs under tracemalloc (which slows it
+    down many times over) and only the peak traced memory is reported.
+    """
+    sys.path.insert(0, str(SCRIPTS_DIR))
+    if trace_memory:
+        tracemalloc.start()
+    import core
+    from design_system import DesignSystemGenerator, generate_design_system
+
+    results = {"rows": 0, "index_build_ms": {}, "latency": {}}
+
+    # Index build time (no disk cache, no in-process memo)
+    build_total = 0.0
+    sources = [(domain, config["file"], config["search_cols"], config["output_cols"], config.get("field_weights"))
+               for domain, config in core.CSV_CONFIG.items()]
+    sources += [(f"stack:{stack}", config["file"], core._STACK_COLS["search_cols"], core._STACK_COLS["output_cols"], None)
+                for stack, config in core.STACK_CONFIG.items()]
+    for name, filename, search_cols, output_cols, field_weights in sources:
+        filepath = core.DATA_DIR / filename
+        if not filepath.exists():
+            continue
+        start = time.perf_counter()
+        index = core.build_index(filepath, search_cols, output_cols, field_weights)
+        elapsed = (time.perf_counter() - start) * 1000
+        results["index_build_ms"][name] = round(elapsed, 3)
+        results["rows"] += len(index.rows)
+        build_total += elapsed
+    results["index_build_total_ms"] = round(build_total, 3)
+
+    clear = core.RESULT_CACHE.clear
+
+    # Warm query latency (indexes loaded, result cache cleared per call)
+    samples = []
+    for domain, queries in QUERY_CORPUS.items():
+        for query in queries:
+            samples += _timed(lambda: core.search(query, domain), repeat, clear)
+    results["latency"]["search"] = _percentiles(samples)
+
+    samples = []
+    for stack, queries in STACK_QUERIES.items():
+        for query in queries:
+            samples += _timed(lambda: core.search_stack(query, stack), repeat, clear)
+    results["latency"]["search_stack"] = _percentiles(samples)
+
+    samples = []
+    for query in FEDERATED_QUERIES:
+        samples += _timed(lambda: core.search_all(query), repeat)
+    results["latency"]["search_all"] = _percentiles(samples)
+
+    generator = DesignSystemGenerator()
+    samples = []
+    for query in DESIGN_SYSTEM_QUERIES:
+        samples += _timed(lambda: generator.generate(query), repeat, clear)
+    results["latency"]["design_system"] = _percentiles(samples)
+
+    samples = []
+    for query in DESIGN_SYSTEM_QUERIES:
+        samples += _timed(lambda: generate_design_system(query), repeat)
+    results["latency"]["design_system_cached"] = _percentiles(samples)
+
+    if trace_memory:
+        peak_kb = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+        return {"peak_memory_kb": peak_kb}
+    return results
+
+
+# ============ ORCHESTRATION ============
+def _cold_start(env: dict, repeat: int, clear_cache_dir: Path = None) -> dict:
+    """Wall time of a fresh `search.py <query>` process."""
+    samples = []
+    for _ in range(repeat):
+        if clear_cache_dir is not None:
+            shutil.rmtree(clear_cache_dir, ignore_errors=True)
+        start = time.perf_counter()
+        subprocess.run([sys.executable, str(SCRIPTS_DIR / "search.py"), COLD_START_QUERY],
+                       env=env, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return _percentiles(samples)
+
+
+def run_scale(factor: int, repeat: int, workdir: Path) -> dict:
+    """Build a scaled corpus and measure it in fresh processes."""
+    data_dir = build_scaled_data(workdir / f"data-{factor}x", factor)
+    cache_dir = workdir / f"cache-{factor}x"
+    env = dict(os.environ, UI_PRO_MAX_DATA_DIR=str(data_dir), UI_PRO_MAX_CACHE_DIR=str(cache_dir),
+               PYTHONDONTWRITEBYTECODE="1")
+    env.pop("UI_PRO_MAX_RESULT_CACHE", None)
+
+    cold_repeat = max(1, min(repeat, 5))
+    result = {
+        "cold_start_empty_cache": _cold_start(env, cold_repeat, clear_cache_dir=cache_dir),
+        "cold_start_warm_cache": _cold_start(env, cold_repeat),
+    }
+
+    worker = [sys.executable, str(Path(__file__).resolve()), "--worker"]
+    proc = subprocess.run(worker + ["--repeat", str(repeat)], env=env, check=True, capture_output=True, text=True)
+    result.update(json.loads(proc.stdout))
+    proc = subprocess.run(worker + ["--repeat", "1", "--trace-memory"], env=env, check=True,
+                          capture_output=True, text=True)
+    result.update(json.loads(proc.stdout))
+    return result
+
+
+def flatten_metrics(report: dict) -> dict:
+    """{"10x.latency.search.p95_ms": value, ...} for every gated metric."""
+    metrics = {}
+    for scale, data in report.get("scales", {}).items():
+        for key in ("index_build_total_ms", "peak_memory_kb"):
+            if key in data:
+                metrics[f"{scale}.{key}"] = data[key]
+        for kind in ("cold_start_empty_cache", "cold_start_warm_cache"):
+            if "p50_ms" in data.get(kind, {}):
+                metrics[f"{scale}.{kind}.p50_ms"] = data[kind]["p50_ms"]
+        for kind, stats in data.get("latency", {}).items():
+            for stat in ("p50_ms", "p95_ms"):
+                if stat in stats:
+                    metrics[f"{scale}.latency.{kind}.{stat}"] = stats[stat]
+    return metrics
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Print a comparison table and return the metrics that regressed."""
+    now, before = flatten_metrics(current), flatten_metrics(baseline)
+    regressions = []
+    print(f"{'metric':<52} {'baseline':>12} {'current':>12} {'change':>9}", file=sys.stderr)
+    for name in sorted(now.keys() & before.keys()):
+        old, new = before[name], now[name]
+        change = (new - old) / old if old else 0.0
+        flag = ""
+        if change > threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"{name:<52} {old:>12.3f} {new:>12.3f} {change:>+8.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="UI Pro Max search engine benchmark")
+    parser.add_argument("--scales", default="1,10,100", help="Comma-separated corpus scale factors (default: 1,10,100)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed repetitions per query (default: 5)")
+    parser.add_argument("--output", "-o", default=None, help="Write results JSON to this file (default: stdout)")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="Baseline results JSON to gate against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed slowdown fraction (default: 0.25)")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--trace-memory", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.repeat, args.trace_memory)))
+        return 0
+
+    factors = [int(f) for f in args.scales.split(",") if f.strip()]
+    report = {
+        "meta": {
+            "generated": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+    with tempfile.TemporaryDirectory(prefix="uipro-bench-") as tmp:
+        for factor in factors:
+            print(f"Benchmarking {factor}x corpus...", file=sys.stderr)
+            report["scales"][f"{factor}x"] = run_scale(factor, args.repeat, Path(tmp))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} metric(s) regressed beyond {args.threshold:.0%}", file=sys.stderr)
+            return 1
+        print("\nNo regressions beyond threshold", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
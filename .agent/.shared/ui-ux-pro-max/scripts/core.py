@@ -4,20 +4,68 @@
 UI/UX Pro Max Core - BM25 search engine for UI/UX style guides
 """
 
-import csv
+import heapq
+import os
 import re
+import sys
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from math import log
-from collections import defaultdict
+from bisect import bisect_left
+from collections import Counter, OrderedDict, defaultdict
 
 # ============ CONFIGURATION ============
-DATA_DIR = Path(__file__).parent.parent / "data"
+DATA_DIR = Path(os.environ.get("UI_PRO_MAX_DATA_DIR", Path(__file__).parent.parent / "data"))
+CACHE_DIR = Path(os.environ.get("UI_PRO_MAX_CACHE_DIR", Path(__file__).parent.parent / ".cache"))
+INDEX_FORMAT_VERSION = 5
 MAX_RESULTS = 3
 
+# Scoring backend: "python" (postings), "numpy" (sparse matrix) or "auto",
+# which switches to numpy for corpora of at least VECTOR_MIN_DOCS rows
+SEARCH_BACKEND = os.environ.get("UI_PRO_MAX_BACKEND", "auto")
+VECTOR_MIN_DOCS = 5000
+
+# Query result cache: in-process LRU + TTL, optionally shared on disk across
+# CLI invocations (UI_PRO_MAX_RESULT_CACHE=disk)
+RESULT_CACHE_SIZE = 512
+RESULT_CACHE_TTL = 600
+RESULT_CACHE_DISK_FILES = 4 * RESULT_CACHE_SIZE  # cap on files kept in the disk tier
+RESULT_CACHE_DISK = os.environ.get("UI_PRO_MAX_RESULT_CACHE", "").lower() == "disk"
+
+# Worker count for multi-domain fan-out: 1 = serial (default), 0 = one per
+# domain capped at the CPU count. Scoring is pure-Python CPU work, so only a
+# process pool can overlap domains, and only pays off on large corpora
+SEARCH_WORKERS = int(os.environ.get("UI_PRO_MAX_WORKERS", "1")) or None
+
+# Tokenizer: words shorter than MIN_TOKEN_LEN are dropped unless protected
+MIN_TOKEN_LEN = 3
+PROTECTED_TOKENS = frozenset({"ui", "ux", "3d", "2d", "ai", "ar", "vr", "xr", "tv", "ml", "os", "io", "qr", "js", "ts", "db", "hr", "pwa"})
+STOPWORDS = frozenset({
+    "the", "and", "for", "with", "from", "that", "this", "are", "was", "were", "has", "have", "had",
+    "you", "your", "our", "its", "into", "onto", "than", "then", "them", "they", "their", "there",
+    "will", "can", "all", "any", "but", "not", "use", "via", "per", "also", "such", "each", "when",
+})
+STEMMING = os.environ.get("UI_PRO_MAX_STEM", "") == "1"
+
+# Fuzzy matching: query tokens missing from a corpus vocabulary are expanded
+# to close terms (typos within the edit budget, or completions of a prefix),
+# each scored at a fraction of an exact match. UI_PRO_MAX_FUZZY=0 disables it.
+FUZZY_MATCHING = os.environ.get("UI_PRO_MAX_FUZZY", "1") != "0"
+FUZZY_MIN_LEN = 4
+FUZZY_WEIGHT = 0.5
+PREFIX_WEIGHT = 0.5
+FUZZY_MAX_EXPANSIONS = 3
+
+# Optional "field_weights" switch a domain to BM25F: each search column is
+# indexed as its own field with its own length normalization, and a match
+# counts field_weights[col] times (1.0 for columns not listed)
 CSV_CONFIG = {
     "style": {
         "file": "styles.csv",
         "search_cols": ["Style Category", "Keywords", "Best For", "Type"],
+        "field_weights": {"Style Category": 3.0, "Keywords": 2.0},
         "output_cols": ["Style Category", "Type", "Keywords", "Primary Colors", "Effects & Animation", "Best For", "Performance", "Accessibility", "Framework Compatibility", "Complexity"]
     },
     "prompt": {
@@ -28,6 +76,7 @@ CSV_CONFIG = {
     "color": {
         "file": "colors.csv",
         "search_cols": ["Product Type", "Keywords", "Notes"],
+        "field_weights": {"Product Type": 3.0, "Keywords": 2.0},
         "output_cols": ["Product Type", "Keywords", "Primary (Hex)", "Secondary (Hex)", "CTA (Hex)", "Background (Hex)", "Text (Hex)", "Border (Hex)", "Notes"]
     },
     "chart": {
@@ -43,6 +92,7 @@ CSV_CONFIG = {
     "product": {
         "file": "products.csv",
         "search_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Key Considerations"],
+        "field_weights": {"Product Type": 3.0, "Keywords": 2.0},
         "output_cols": ["Product Type", "Keywords", "Primary Style Recommendation", "Secondary Styles", "Landing Page Pattern", "Dashboard Style (if applicable)", "Color Palette Focus"]
     },
     "ux": {
@@ -96,99 +146,908 @@ _STACK_COLS = {
 AVAILABLE_STACKS = list(STACK_CONFIG.keys())
 
 
+# ============ TOKENIZER ============
+_WORD_RE = re.compile(r"\w+")
+
+
+def light_stem(word):
+    """Strip common English inflections (plural, -ing, -ed)"""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 5 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 4 and word.endswith("ed") and not word.endswith("eed"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+class Tokenizer:
+    """Configurable tokenizer pipeline: normalize -> split -> filter -> stem.
+
+    Per-word filter/stem decisions and whole-text results both go through
+    bounded LRU caches, so repeated queries cost a dict lookup.
+    """
+
+    def __init__(self, min_len=MIN_TOKEN_LEN, stopwords=STOPWORDS, protected=PROTECTED_TOKENS,
+                 stem=STEMMING, cache_size=4096, word_cache_size=16384):
+        self.min_len = min_len
+        self.stopwords = frozenset(stopwords or ())
+        self.protected = frozenset(protected or ())
+        self.stemmer = light_stem if stem else None
+        self._word = lru_cache(maxsize=word_cache_size)(self._filter_word)
+        self._cached = lru_cache(maxsize=cache_size)(self._tokenize)
+        self._signature = (self.min_len, tuple(sorted(self.stopwords)), tuple(sorted(self.protected)),
+                           self.stemmer.__name__ if self.stemmer else None)
+
+    def signature(self):
+        """Stable description of the pipeline, used in index cache keys"""
+        return self._signature
+
+    def _filter_word(self, word):
+        """Filter and stem one lowercased word (None if dropped)"""
+        if word in self.protected:
+            return word
+        if len(word) < self.min_len or word in self.stopwords:
+            return None
+        return self.stemmer(word) if self.stemmer else word
+
+    def _tokenize(self, text):
+        tokens = []
+        for word in _WORD_RE.findall(text.lower()):
+            token = self._word(word)
+            if token is not None:
+                tokens.append(token)
+        return tuple(tokens)
+
+    def __call__(self, text, cache=True):
+        text = str(text)
+        return list(self._cached(text) if cache else self._tokenize(text))
+
+
+DEFAULT_TOKENIZER = Tokenizer()
+
+
+# ============ FUZZY VOCABULARY ============
+def _edit_distance(a, b, limit):
+    """Levenshtein distance between a and b, or limit + 1 once it exceeds limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _trigrams(term):
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class VocabularyIndex:
+    """Character-trigram and sorted-prefix index over a corpus vocabulary.
+
+    expand() maps an out-of-vocabulary token to at most FUZZY_MAX_EXPANSIONS
+    terms with a weight below 1. Candidates come from the trigram postings
+    (an edit changes at most 3 trigrams), so only terms sharing enough
+    trigrams are ever compared, never the whole vocabulary. Expansions are
+    kept in a bounded LRU cache.
+    """
+
+    def __init__(self, terms, min_len=FUZZY_MIN_LEN, max_expansions=FUZZY_MAX_EXPANSIONS, cache_size=4096):
+        self.terms = sorted(terms)
+        self.min_len = min_len
+        self.max_expansions = max_expansions
+        grams = defaultdict(list)
+        for term_id, term in enumerate(self.terms):
+            for gram in _trigrams(term):
+                grams[gram].append(term_id)
+        self.grams = dict(grams)
+        self.expand = lru_cache(maxsize=cache_size)(self._expand)
+
+    @staticmethod
+    def max_edits(token):
+        """Typo budget: short tokens only get prefix completions"""
+        if len(token) < 7:
+            return 0
+        return 1 if len(token) < 10 else 2
+
+    def _prefixed(self, token):
+        """Vocabulary terms that extend token"""
+        start = bisect_left(self.terms, token)
+        end = bisect_left(self.terms, token + "\uffff", start)
+        return self.terms[start:end]
+
+    def _similar(self, token, max_edits):
+        """(term, edits) for terms within max_edits of token"""
+        grams = _trigrams(token)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+        needed = max(1, len(grams) - 3 * max_edits)
+        matches = []
+        for term_id, count in shared.items():
+            if count < needed:
+                continue
+            term = self.terms[term_id]
+            edits = _edit_distance(token, term, max_edits)
+            if edits <= max_edits:
+                matches.append((term, edits))
+        return matches
+
+    def _expand(self, token):
+        """[(term, weight)] for an out-of-vocabulary token, best first (see expand)"""
+        if len(token) < self.min_len:
+            return []
+        max_edits = self.max_edits(token)
+        weights = {}
+        if max_edits:
+            weights = {term: FUZZY_WEIGHT ** edits for term, edits in self._similar(token, max_edits)}
+        for term in self._prefixed(token):
+            weights[term] = max(weights.get(term, 0), PREFIX_WEIGHT)
+        ranked = sorted(weights.items(), key=lambda item: (-item[1], len(item[0]), item[0]))
+        return ranked[:self.max_expansions]
+
+
 # ============ BM25 IMPLEMENTATION ============
+def _load_numpy():
+    """Import NumPy lazily so plain CLI runs never pay for it; None if missing"""
+    try:
+        import numpy as np
+    except ImportError:
+        return None
+    return np
+
+
+class _SparseWeights:
+    """CSR term-document matrix of precomputed BM25 weights (rows = terms)"""
+
+    def __init__(self, bm25, np):
+        self.np = np
+        self.terms = {term: row for row, term in enumerate(sorted(bm25.postings))}
+        indptr, indices, tfs, idfs = [0], [], [], []
+        for term in sorted(bm25.postings):
+            plist = bm25.postings[term]
+            indices.extend(idx for idx, _ in plist)
+            tfs.extend(tf for _, tf in plist)
+            idfs.extend([bm25.idf[term]] * len(plist))
+            indptr.append(len(indices))
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        tf = np.asarray(tfs, dtype=np.float64)
+        k1, b = bm25.k1, bm25.b
+        # Same operation order as the postings path so both backends agree bit for bit
+        numerator = tf * (k1 + 1)
+        if bm25.field_weights:
+            denominator = tf + k1
+        else:
+            doc_len = np.asarray(bm25.doc_lengths, dtype=np.float64)[self.indices]
+            denominator = tf + k1 * (1 - b + b * doc_len / bm25.avgdl)
+        self.data = np.asarray(idfs, dtype=np.float64) * numerator / denominator
+        self.N = bm25.N
+
+    def matches(self, query_counts):
+        """Score documents as one sparse query-vector x term-document product.
+
+        Only the CSR rows of the query terms are touched. Returns
+        (doc ids, scores) for documents with a positive score.
+        """
+        np = self.np
+        dense = np.zeros(self.N, dtype=np.float64)
+        for term, count in query_counts:
+            row = self.terms[term]
+            start, end = self.indptr[row], self.indptr[row + 1]
+            dense[self.indices[start:end]] += self.data[start:end] * count
+        ids = np.flatnonzero(dense)
+        scores = dense[ids]
+        positive = scores > 0
+        return ids[positive], scores[positive]
+
+
 class BM25:
-    """BM25 ranking algorithm for text search"""
+    """BM25 ranking algorithm for text search (inverted-index backed).
+
+    Fitted with field_weights, it scores BM25F instead: postings hold the
+    weighted, per-field length-normalized term frequency. Whenever documents
+    are given as field texts, field_tfs holds the raw per-field counts
+    behind each posting.
+    """
 
-    def __init__(self, k1=1.5, b=0.75):
+    def __init__(self, k1=1.5, b=0.75, backend=None, tokenizer=None, fuzzy=None):
         self.k1 = k1
         self.b = b
+        self.tokenizer = tokenizer or DEFAULT_TOKENIZER
+        self.backend = backend or SEARCH_BACKEND
+        self.fuzzy = FUZZY_MATCHING if fuzzy is None else fuzzy
+        self._weights = None
+        self._vocabulary = None
         self.corpus = []
         self.doc_lengths = []
         self.avgdl = 0
         self.idf = {}
         self.doc_freqs = defaultdict(int)
+        self.postings = {}
         self.N = 0
+        self.field_weights = None
+        self.field_lengths = []
+        self.avg_field_lengths = ()
+        self.field_tfs = {}
 
     def tokenize(self, text):
-        """Lowercase, split, remove punctuation, filter short words"""
-        text = re.sub(r'[^\w\s]', ' ', str(text).lower())
-        return [w for w in text.split() if len(w) > 2]
+        """Run text through the tokenizer pipeline"""
+        return self.tokenizer(text)
 
-    def fit(self, documents):
-        """Build BM25 index from documents"""
-        self.corpus = [self.tokenize(doc) for doc in documents]
-        self.N = len(self.corpus)
+    def fit(self, documents, field_weights=None):
+        """Build BM25 index and term -> [(doc_id, tf)] postings from documents.
+
+        With field_weights, each document is a sequence of field texts
+        aligned with the weights and the index is fitted as BM25F. Without
+        them, documents may still be field sequences: they are scored as
+        plain BM25 over the concatenated fields, and field_tfs is kept.
+        """
+        if field_weights:
+            postings = self._fit_fields(documents, field_weights)
+        else:
+            postings = self._fit_text(documents)
         if self.N == 0:
             return
+
+        self.postings = dict(postings)
+        for word, plist in self.postings.items():
+            self.doc_freqs[word] = len(plist)
+            self.idf[word] = log((self.N - len(plist) + 0.5) / (len(plist) + 0.5) + 1)
+
+    def _fit_text(self, documents):
+        # Documents are unique, so skip the per-text LRU cache at build time
+        documents = list(documents)
+        if documents and not isinstance(documents[0], str):
+            return self._fit_text_fields(documents)
+        self.corpus = [self.tokenizer(doc, cache=False) for doc in documents]
+        self.N = len(self.corpus)
+        postings = defaultdict(list)
+        if self.N == 0:
+            return postings
         self.doc_lengths = [len(doc) for doc in self.corpus]
         self.avgdl = sum(self.doc_lengths) / self.N
 
-        for doc in self.corpus:
-            seen = set()
+        for idx, doc in enumerate(self.corpus):
+            term_freqs = defaultdict(int)
             for word in doc:
-                if word not in seen:
-                    self.doc_freqs[word] += 1
-                    seen.add(word)
+                term_freqs[word] += 1
+            for word, tf in term_freqs.items():
+                postings[word].append((idx, tf))
+        return postings
+
+    def _fit_text_fields(self, documents):
+        """Plain BM25 over concatenated field texts, keeping per-field counts"""
+        fields = [[self.tokenizer(text, cache=False) for text in doc] for doc in documents]
+        self.corpus = [[word for tokens in doc for word in tokens] for doc in fields]
+        self.N = len(fields)
+        self.doc_lengths = [len(doc) for doc in self.corpus]
+        self.avgdl = sum(self.doc_lengths) / self.N
+
+        postings = defaultdict(list)
+        field_tfs = defaultdict(list)
+        for idx, doc in enumerate(fields):
+            term_freqs = defaultdict(lambda: [0] * len(doc))
+            for f, tokens in enumerate(doc):
+                for word in tokens:
+                    term_freqs[word][f] += 1
+            for word, tfs in term_freqs.items():
+                postings[word].append((idx, sum(tfs)))
+                field_tfs[word].append(tuple(tfs))
+        self.field_tfs = dict(field_tfs)
+        return postings
+
+    def _fit_fields(self, documents, field_weights):
+        self.field_weights = tuple(field_weights)
+        fields = [[self.tokenizer(text, cache=False) for text in doc] for doc in documents]
+        self.corpus = [[word for tokens in doc for word in tokens] for doc in fields]
+        self.N = len(fields)
+        postings = defaultdict(list)
+        if self.N == 0:
+            return postings
+        self.field_lengths = [tuple(len(tokens) for tokens in doc) for doc in fields]
+        self.doc_lengths = [sum(lengths) for lengths in self.field_lengths]
+        self.avgdl = sum(self.doc_lengths) / self.N
+        self.avg_field_lengths = tuple(sum(lengths[f] for lengths in self.field_lengths) / self.N
+                                       for f in range(len(self.field_weights)))
+
+        field_tfs = defaultdict(list)
+        for idx, doc in enumerate(fields):
+            term_freqs = defaultdict(lambda: [0] * len(doc))
+            for f, tokens in enumerate(doc):
+                for word in tokens:
+                    term_freqs[word][f] += 1
+            norms = self.field_norms(idx)
+            for word, tfs in term_freqs.items():
+                tf = sum(weight * count / norm for weight, count, norm in zip(self.field_weights, tfs, norms) if count)
+                postings[word].append((idx, tf))
+                field_tfs[word].append(tuple(tfs))
+        self.field_tfs = dict(field_tfs)
+        return postings
+
+    def field_norms(self, idx):
+        """Per-field BM25 length normalization (1 - b + b * len / avglen) of a document"""
+        b = self.b
+        return tuple(1 - b + b * length / avg if avg else 1.0
+                     for length, avg in zip(self.field_lengths[idx], self.avg_field_lengths))
+
+    def vocabulary(self):
+        """Fuzzy/prefix index over the fitted vocabulary, built on first use"""
+        if self._vocabulary is None:
+            self._vocabulary = VocabularyIndex(self.postings)
+        return self._vocabulary
+
+    def _query_counts(self, query):
+        """Query terms with their (possibly fractional) weight, in vocabulary order.
+
+        Known tokens count once per occurrence; unknown ones are replaced by
+        their fuzzy expansions when fuzzy matching is on.
+        """
+        counts = defaultdict(int)
+        for token, count in Counter(self.tokenize(query)).items():
+            if token in self.postings:
+                counts[token] += count
+            elif self.fuzzy and self.postings:
+                for term, weight in self.vocabulary().expand(token):
+                    counts[term] += count * weight
+        return sorted(counts.items())
+
+    def _vector_weights(self):
+        """Compiled sparse weights when the numpy backend applies, else None"""
+        if self.backend == "python" or (self.backend == "auto" and self.N < VECTOR_MIN_DOCS):
+            return None
+        if self._weights is None:
+            np = _load_numpy()
+            if np is None:
+                self.backend = "python"
+                return None
+            self._weights = _SparseWeights(self, np)
+        return self._weights
+
+    def _accumulate(self, query):
+        """Sum per-document scores over the postings of the query tokens"""
+        scores = defaultdict(float)
+        k1, b, avgdl = self.k1, self.b, self.avgdl
+
+        if self.field_weights:
+            # BM25F postings are already weighted and length-normalized
+            for token, count in self._query_counts(query):
+                idf = self.idf[token]
+                for idx, tf in self.postings[token]:
+                    scores[idx] += idf * (tf * (k1 + 1)) / (tf + k1) * count
+            return scores
 
-        for word, freq in self.doc_freqs.items():
-            self.idf[word] = log((self.N - freq + 0.5) / (freq + 0.5) + 1)
+        for token, count in self._query_counts(query):
+            idf = self.idf[token]
+            for idx, tf in self.postings[token]:
+                numerator = tf * (k1 + 1)
+                denominator = tf + k1 * (1 - b + b * self.doc_lengths[idx] / avgdl)
+                scores[idx] += idf * numerator / denominator * count
+
+        return scores
+
+    def _ranked(self, query):
+        """All (idx, score) pairs with score > 0 as (ids, scores) ready for ranking"""
+        weights = self._vector_weights()
+        if weights is None:
+            return None, [(idx, score) for idx, score in self._accumulate(query).items() if score > 0]
+        return weights, weights.matches(self._query_counts(query))
 
     def score(self, query):
-        """Score all documents against query"""
-        query_tokens = self.tokenize(query)
-        scores = []
+        """Score documents containing at least one query term.
 
-        for idx, doc in enumerate(self.corpus):
-            score = 0
-            doc_len = self.doc_lengths[idx]
-            term_freqs = defaultdict(int)
-            for word in doc:
-                term_freqs[word] += 1
+        Only the postings of the query tokens are walked, so the cost grows
+        with posting-list length rather than corpus size. Documents without
+        any query term are omitted (they would score 0).
+        """
+        return self.top_k(query, self.N)
+
+    def top_k(self, query, k, offset=0):
+        """Return the (idx, score) pairs ranked offset..offset+k with score > 0.
+
+        Uses bounded heap selection, O(N log k) over matching documents,
+        with the same ordering as score(): descending score, then doc id.
+        """
+        if offset < 0:
+            raise ValueError(f"offset must be >= 0, got {offset}")
+        if k <= 0:
+            return []
+        weights, matches = self._ranked(query)
+        if weights is None:
+            ranked = heapq.nsmallest(offset + k, matches, key=lambda x: (-x[1], x[0]))
+            return ranked[offset:]
+
+        np = weights.np
+        ids, scores = matches
+        limit = offset + k
+        if limit < len(ids):
+            # Keep every document tied with the k-th score so doc-id order stays stable
+            threshold = np.partition(-scores, limit - 1)[limit - 1]
+            keep = -scores <= threshold
+            ids, scores = ids[keep], scores[keep]
+        order = np.lexsort((ids, -scores))[offset:limit]
+        return [(int(ids[i]), float(scores[i])) for i in order]
+
+    def max_score(self, query):
+        """Upper bound of score() for this query in this corpus.
+
+        Each term contributes at most idf * (k1 + 1); terms absent from the
+        corpus use the idf of an unseen term. Dividing by this bound puts
+        scores from differently sized corpora on a common 0..1 scale.
+        """
+        unseen_idf = log((self.N + 0.5) / 0.5 + 1)
+        return sum(self.idf.get(token, unseen_idf) * (self.k1 + 1) for token in self.tokenize(query))
 
-            for token in query_tokens:
-                if token in self.idf:
-                    tf = term_freqs[token]
-                    idf = self.idf[token]
-                    numerator = tf * (self.k1 + 1)
-                    denominator = tf + self.k1 * (1 - self.b + self.b * doc_len / self.avgdl)
-                    score += idf * numerator / denominator
+    def explain(self, query, idx):
+        """Per-term breakdown of one document's score, read from the postings.
 
-            scores.append((idx, score))
+        Each entry has the term, its query weight (below 1 for fuzzy
+        expansions), tf, idf, length normalization and score contribution;
+        contributions are summed in ranking order, so they add up to the
+        document's score. Indexes fitted on field texts add the raw per-field
+        counts ("field_tfs"); BM25F entries also carry per-field
+        normalizations, and their tf is the weighted, normalized pseudo
+        frequency.
+        """
+        k1, b = self.k1, self.b
+        terms = []
+        for term, weight in self._query_counts(query):
+            plist = self.postings[term]
+            pos = bisect_left(plist, (idx,))
+            if pos == len(plist) or plist[pos][0] != idx:
+                continue
+            tf = plist[pos][1]
+            idf = self.idf[term]
+            entry = {"term": term, "weight": weight, "tf": tf, "idf": idf}
+            if self.field_tfs:
+                entry["field_tfs"] = self.field_tfs[term][pos]
+            if self.field_weights:
+                entry["length_norm"] = self.field_norms(idx)
+                entry["score"] = idf * (tf * (k1 + 1)) / (tf + k1) * weight
+            else:
+                norm = 1 - b + b * self.doc_lengths[idx] / self.avgdl
+                entry["length_norm"] = norm
+                entry["score"] = idf * (tf * (k1 + 1)) / (tf + k1 * norm) * weight
+            terms.append(entry)
+        return terms
 
-        return sorted(scores, key=lambda x: x[1], reverse=True)
+    def get_state(self):
+        """Export the fitted index as plain data (for the on-disk cache)"""
+        return {
+            "k1": self.k1,
+            "b": self.b,
+            "N": self.N,
+            "avgdl": self.avgdl,
+            "doc_lengths": self.doc_lengths,
+            "idf": self.idf,
+            "postings": self.postings,
+            "field_weights": self.field_weights,
+            "field_lengths": self.field_lengths,
+            "avg_field_lengths": self.avg_field_lengths,
+            "field_tfs": self.field_tfs,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a fitted index from get_state() output without re-tokenizing.
+
+        Also accepts the state after a JSON round trip: lists are turned back
+        into the tuples the scorer expects, and a malformed state raises
+        ValueError, TypeError, KeyError or AttributeError.
+        """
+        bm25 = cls(float(state["k1"]), float(state["b"]))
+        bm25.N = int(state["N"])
+        bm25.avgdl = float(state["avgdl"])
+        bm25.doc_lengths = [int(length) for length in state["doc_lengths"]]
+        if len(bm25.doc_lengths) != bm25.N:
+            raise ValueError("doc_lengths does not match N")
+        bm25.idf = {str(word): float(idf) for word, idf in state["idf"].items()}
+        bm25.postings = {str(word): [(int(idx), float(tf)) for idx, tf in plist]
+                         for word, plist in state["postings"].items()}
+        field_weights = state["field_weights"]
+        bm25.field_weights = tuple(float(weight) for weight in field_weights) if field_weights else None
+        bm25.field_lengths = [tuple(lengths) for lengths in state["field_lengths"]]
+        bm25.avg_field_lengths = tuple(state["avg_field_lengths"])
+        bm25.field_tfs = {str(word): [tuple(tfs) for tfs in tf_list] for word, tf_list in state["field_tfs"].items()}
+        bm25.doc_freqs = defaultdict(int, {word: len(plist) for word, plist in bm25.postings.items()})
+        return bm25
 
 
 # ============ SEARCH FUNCTIONS ============
-def _load_csv(filepath):
-    """Load CSV and return list of dicts"""
-    with open(filepath, 'r', encoding='utf-8') as f:
-        return list(csv.DictReader(f))
+def _load_csv(filepath, columns):
+    """Load only the given CSV columns, column-oriented: {column: [value per row]}
 
+    Columns missing from the header are left out. Repeated values within a
+    column share one string object.
+    """
+    import csv  # only needed when an index is (re)built
 
-def _search_csv(filepath, search_cols, output_cols, query, max_results):
-    """Core search function using BM25"""
-    if not filepath.exists():
-        return []
+    with open(filepath, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        positions = {}
+        for col in columns:
+            if col in header and col not in positions:
+                positions[col] = header.index(col)
+        data = {col: [] for col in positions}
+        seen = {col: {} for col in positions}
+        for record in reader:
+            if not record:
+                continue
+            for col, pos in positions.items():
+                # Short rows read as None, like csv.DictReader's restval
+                value = record[pos] if pos < len(record) else None
+                data[col].append(seen[col].setdefault(value, value))
+    return data
+
+
+class RowStore:
+    """Column-oriented output rows; dicts are only built for returned results"""
+
+    __slots__ = ("columns", "values")
+
+    def __init__(self, columns, values):
+        self.columns = tuple(sys.intern(col) for col in columns)
+        self.values = tuple(values)
+
+    def __len__(self):
+        return len(self.values[0]) if self.values else 0
+
+    def row(self, idx):
+        """Materialize one row as a fresh dict"""
+        return {col: values[idx] for col, values in zip(self.columns, self.values)}
+
+    def __getitem__(self, idx):
+        return self.row(idx)
 
-    data = _load_csv(filepath)
+    def __getstate__(self):
+        return self.columns, self.values
+
+    def __setstate__(self, state):
+        columns, values = state
+        self.columns = tuple(sys.intern(col) for col in columns)
+        self.values = values
+
+
+class SearchIndex:
+    """Fitted BM25 index plus the projected output rows of one CSV file"""
+
+    def __init__(self, bm25, rows, fingerprint):
+        self.bm25 = bm25
+        self.rows = rows
+        self.fingerprint = fingerprint
+
+
+_INDEXES = {}
+_INDEX_LOCK = threading.Lock()  # guards _INDEX_BUILD_LOCKS
+_INDEX_BUILD_LOCKS = {}  # one lock per index key, so cold builds of different indexes overlap
+
+
+def _fingerprint(filepath):
+    """Identify a source CSV version by mtime and size"""
+    stat = filepath.stat()
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _cache_path(filepath):
+    """Location of the compiled index for a data file"""
+    rel = filepath.relative_to(DATA_DIR) if filepath.is_relative_to(DATA_DIR) else Path(filepath.name)
+    return CACHE_DIR / (rel.with_suffix("").as_posix().replace("/", "--") + ".idx.json")
+
+
+def _build_index(filepath, search_cols, output_cols, fingerprint, field_weights=None):
+    """Parse, tokenize and fit a CSV file (as BM25F when field_weights are given)"""
+    data = _load_csv(filepath, list(search_cols) + list(output_cols))
+    count = len(next(iter(data.values()), []))
 
     # Build documents from search columns
-    documents = [" ".join(str(row.get(col, "")) for col in search_cols) for row in data]
+    search_values = [data.get(col) for col in search_cols]
+    fields = [tuple("" if values is None else str(values[i]) for values in search_values) for i in range(count)]
 
-    # BM25 search
     bm25 = BM25()
-    bm25.fit(documents)
-    ranked = bm25.score(query)
+    if field_weights:
+        bm25.fit(fields, [field_weights.get(col, 1.0) for col in search_cols])
+    else:
+        bm25.fit(fields)
+    columns = [col for col in output_cols if col in data]
+    rows = RowStore(columns, [data[col] for col in columns])
+    return SearchIndex(bm25, rows, fingerprint)
+
+
+def _read_cached_index(cache_file, key, fingerprint):
+    """Load a compiled index from disk, or None if missing, stale or malformed"""
+    import json
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload["version"] != INDEX_FORMAT_VERSION or payload["key"] != repr(key) \
+                or payload["fingerprint"] != list(fingerprint):
+            return None
+        bm25 = BM25.from_state(payload["bm25"])
+        columns, values = payload["rows"]
+        rows = RowStore([str(col) for col in columns], [tuple(column) for column in values])
+        if len(rows.columns) != len(rows.values) or any(len(column) != bm25.N for column in rows.values):
+            return None
+    except (OSError, ValueError, TypeError, KeyError, AttributeError):
+        return None
+    return SearchIndex(bm25, rows, fingerprint)
+
+
+def _write_cached_index(cache_file, key, index):
+    """Persist a compiled index atomically as JSON; failures only cost a rebuild next time"""
+    import json
+    payload = {
+        "version": INDEX_FORMAT_VERSION,
+        "key": repr(key),
+        "fingerprint": list(index.fingerprint),
+        "bm25": index.bm25.get_state(),
+        "rows": [index.rows.columns, index.rows.values],
+    }
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_file, cache_file)
+    except (OSError, TypeError, ValueError):
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+
+def _index_key(filepath, search_cols, output_cols, field_weights):
+    """In-process memo key of an index"""
+    return (str(filepath), tuple(search_cols), tuple(output_cols), tuple(sorted((field_weights or {}).items())))
+
+
+def build_index(filepath, search_cols, output_cols, field_weights=None):
+    """Build a CSV's index from scratch and make it the one load_index() returns.
+
+    Skips the in-process memo and the disk cache (which is left untouched),
+    so callers such as benchmark.py can time a real build.
+    """
+    filepath = Path(filepath)
+    index = _build_index(filepath, search_cols, output_cols, _fingerprint(filepath), field_weights)
+    _INDEXES[_index_key(filepath, search_cols, output_cols, field_weights)] = index
+    return index
+
+
+def load_index(filepath, search_cols, output_cols, field_weights=None):
+    """Return the compiled index for a CSV file.
+
+    Indexes are memoized in-process and persisted under CACHE_DIR, keyed by
+    the CSV's mtime and size, so they are only rebuilt when the source changes.
+    """
+    filepath = Path(filepath)
+    key = _index_key(filepath, search_cols, output_cols, field_weights)
+    fingerprint = _fingerprint(filepath)
+
+    index = _INDEXES.get(key)
+    if index is not None and index.fingerprint == fingerprint:
+        return index
+    with _INDEX_LOCK:
+        build_lock = _INDEX_BUILD_LOCKS.setdefault(key, threading.Lock())
+
+    with build_lock:
+        # Another thread may have loaded it while this one waited
+        index = _INDEXES.get(key)
+        if index is not None and index.fingerprint == fingerprint:
+            return index
+
+        cache_file = _cache_path(filepath)
+        disk_key = (filepath.name, key[1], key[2], key[3], DEFAULT_TOKENIZER.signature())
+        index = _read_cached_index(cache_file, disk_key, fingerprint)
+        if index is None:
+            index = _build_index(filepath, search_cols, output_cols, fingerprint, field_weights)
+            _write_cached_index(cache_file, disk_key, index)
+        _INDEXES[key] = index
+        return index
+
+
+class ResultCache:
+    """LRU + TTL cache of ranked rows, with an optional on-disk tier"""
+
+    def __init__(self, maxsize=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, disk_dir=None,
+                 max_disk_files=RESULT_CACHE_DISK_FILES):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.disk_dir = disk_dir
+        self.max_disk_files = max_disk_files
+        self._puts_until_prune = 0  # prune on the first disk write of each process
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _disk_file(self, key):
+        import hashlib
+        return self.disk_dir / (hashlib.sha1(repr(key).encode("utf-8")).hexdigest() + ".json")
+
+    def get(self, key):
+        """Cached value for key, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                del self._entries[key]
+
+        if self.disk_dir is not None:
+            import json
+            disk_file = self._disk_file(key)
+            try:
+                with open(disk_file, 'r', encoding='utf-8') as f:
+                    payload = json.load(f)
+                expires, stored_key, value = payload["expires"], payload["key"], payload["value"]
+            except (OSError, ValueError, TypeError, KeyError):
+                expires = None
+            if expires is not None and expires <= now:
+                self._unlink(disk_file)
+            elif expires is not None and stored_key == repr(key):
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value, expires)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store value for key in memory (and on disk when enabled)"""
+        expires = time.time() + self.ttl
+        with self._lock:
+            self._store(key, value, expires)
+        if self.disk_dir is not None:
+            import json
+            disk_file = self._disk_file(key)
+            tmp_file = disk_file.with_name(f"{disk_file.name}.{os.getpid()}.tmp")
+            try:
+                disk_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump({"expires": expires, "key": repr(key), "value": value}, f)
+                os.replace(tmp_file, disk_file)
+            except (OSError, TypeError, ValueError):
+                self._unlink(tmp_file)
+                return
+            with self._lock:
+                self._puts_until_prune -= 1
+                prune = self._puts_until_prune < 0
+                if prune:
+                    self._puts_until_prune = self.maxsize
+            if prune:
+                self.prune_disk()
+
+    @staticmethod
+    def _unlink(path):
+        try:
+            path.unlink()
+        except OSError:
+            pass
+
+    def prune_disk(self):
+        """Delete expired disk files (by mtime), then the oldest entries beyond max_disk_files"""
+        if self.disk_dir is None:
+            return
+        cutoff = time.time() - self.ttl
+        live = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if mtime <= cutoff:
+                        self._unlink(Path(entry.path))
+                    elif entry.name.endswith(".json"):
+                        live.append((mtime, entry.path))
+        except OSError:
+            return
+        if len(live) > self.max_disk_files:
+            live.sort()
+            for _, path in live[:len(live) - self.max_disk_files]:
+                self._unlink(Path(path))
+
+    def _store(self, key, value, expires):
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "disk": self.disk_dir is not None
+            }
 
-    # Get top results with score > 0
-    results = []
-    for idx, score in ranked[:max_results]:
-        if score > 0:
-            row = data[idx]
-            results.append({col: row.get(col, "") for col in output_cols if col in row})
 
-    return results
+RESULT_CACHE = ResultCache(disk_dir=CACHE_DIR / "results" if RESULT_CACHE_DISK else None)
+
+
+def cache_stats():
+    """Hit/miss counters of the query result cache"""
+    return RESULT_CACHE.stats()
+
+
+def _rounded(value):
+    """Round the floats of a (nested) explain entry for display"""
+    if isinstance(value, float):
+        return round(value, 4)
+    if isinstance(value, dict):
+        return {key: _rounded(item) for key, item in value.items()}
+    return value
+
+
+def _explain_hits(index, search_cols, query, ids):
+    """Score breakdown per returned document (see BM25.explain).
+
+    The matched fields come from the index's per-field counts; BM25F terms
+    also report the length normalization of each matched field.
+    """
+    bm25 = index.bm25
+    query_tokens = set(bm25.tokenize(query))
+    explanations = []
+    for idx in ids:
+        terms = bm25.explain(query, idx)
+        for entry in terms:
+            fields = {col: count for col, count in zip(search_cols, entry.pop("field_tfs", ())) if count}
+            if bm25.field_weights:
+                norms = dict(zip(search_cols, entry["length_norm"]))
+                entry["length_norm"] = {col: norms[col] for col in fields}
+            entry["fields"] = fields
+            entry["fuzzy"] = entry["term"] not in query_tokens
+        explanations.append({"score": round(sum(entry["score"] for entry in terms), 4),
+                             "terms": [_rounded(entry) for entry in terms]})
+    return explanations
+
+
+def _search_csv(filepath, search_cols, output_cols, query, max_results, offset=0, field_weights=None,
+                explain=False):
+    """Core search function using BM25; returns (rows, explanations or None)"""
+    if not filepath.exists():
+        return [], None
+
+    index = load_index(filepath, search_cols, output_cols, field_weights)
+
+    # Normalized query tokens + index version: equivalent queries share an entry
+    # and edits to the CSV invalidate it
+    key = (filepath.name, tuple(search_cols), tuple(index.bm25.tokenize(query)), max_results, offset,
+           INDEX_FORMAT_VERSION, index.fingerprint, index.bm25.tokenizer.signature(), index.bm25.fuzzy,
+           index.bm25.field_weights)
+    ids = RESULT_CACHE.get(key)
+    if ids is None:
+        # Top results with score > 0, paginated by offset
+        ids = [idx for idx, _ in index.bm25.top_k(query, max_results, offset)]
+        RESULT_CACHE.put(key, ids)
+
+    rows = [index.rows.row(idx) for idx in ids]
+    return rows, (_explain_hits(index, search_cols, query, ids) if explain else None)
 
 
 def detect_domain(query):
@@ -214,10 +1073,18 @@ def detect_domain(query):
     return best if scores[best] > 0 else "style"
 
 
-def search(query, domain=None, max_results=MAX_RESULTS):
-    """Main search function with auto-domain detection"""
+def search(query, domain=None, max_results=MAX_RESULTS, offset=0, explain=False):
+    """Main search function with auto-domain detection.
+
+    With explain=True the result also has "explain": one per-term score
+    breakdown per returned row (not available for domain "all").
+    """
     if domain is None:
         domain = detect_domain(query)
+    if domain == "all":
+        if offset or explain:
+            return {"error": "offset and explain are not supported for domain 'all'", "domain": domain}
+        return search_all(query, max_results=max_results)
 
     config = CSV_CONFIG.get(domain, CSV_CONFIG["style"])
     filepath = DATA_DIR / config["file"]
@@ -225,18 +1092,122 @@ def search(query, domain=None, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"File not found: {filepath}", "domain": domain}
 
-    results = _search_csv(filepath, config["search_cols"], config["output_cols"], query, max_results)
+    results, explanations = _search_csv(filepath, config["search_cols"], config["output_cols"], query,
+                                        max_results, offset, config.get("field_weights"), explain)
 
-    return {
+    result = {
         "domain": domain,
         "query": query,
         "file": config["file"],
         "count": len(results),
         "results": results
     }
+    if offset:
+        result["offset"] = offset
+    if explanations is not None:
+        result["explain"] = explanations
+    return result
+
+
+_POOLS = {}
+_POOL_LOCK = threading.Lock()
+
+
+def _executor(kind, workers):
+    """Shared thread/process pool, created on first use"""
+    with _POOL_LOCK:
+        pool = _POOLS.get((kind, workers))
+        if pool is None:
+            if kind == "process":
+                from concurrent.futures import ProcessPoolExecutor
+                pool = ProcessPoolExecutor(max_workers=workers)
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="uipro-search")
+            _POOLS[(kind, workers)] = pool
+        return pool
+
+
+def _search_domain(domain, query, limit, max_results):
+    """Rank one domain for search_all(); runs inside a pool worker"""
+    start = time.perf_counter()
+    config = CSV_CONFIG.get(domain)
+    if config is None:
+        return {"error": f"Unknown domain: {domain}", "domain": domain}, []
+    filepath = DATA_DIR / config["file"]
+    if not filepath.exists():
+        return {"error": f"File not found: {filepath}", "domain": domain}, []
+
+    index = load_index(filepath, config["search_cols"], config["output_cols"], config.get("field_weights"))
+    ranked = index.bm25.top_k(query, max(limit, max_results))
+    bound = index.bm25.max_score(query) or 1.0
+
+    rows = [index.rows.row(idx) for idx, _ in ranked[:limit]]
+    hits = [(score / bound, index.rows.row(idx)) for idx, score in ranked[:max_results]]
+    result = {
+        "domain": domain,
+        "query": query,
+        "file": config["file"],
+        "count": len(rows),
+        "results": rows,
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+    }
+    return result, hits
+
+
+def search_all(query, domains=None, max_results=MAX_RESULTS, per_domain=None,
+               domain_queries=None, workers=SEARCH_WORKERS, executor="process"):
+    """Federated search across several CSV_CONFIG domains in one call.
+
+    Every domain keeps its own BM25 statistics; scores are normalized by the
+    query's maximum attainable score in that domain, and the merged top
+    max_results hits are tagged with "domain" and "score". "by_domain" holds
+    a search()-shaped result per domain (plus its "elapsed_ms"), limited by
+    per_domain[domain] (default max_results) and identical to calling
+    search() for that domain. domain_queries overrides the query per domain.
 
+    Domains are ranked one after another by default (workers=1): scoring
+    a shipped domain takes well under a millisecond of GIL-bound Python, so
+    a thread pool is slower than serial and a process pool only wins once
+    per-domain scoring outweighs its IPC (large custom corpora). workers > 1
+    (None = one per domain, capped at the CPU count) ranks them on a shared
+    process pool, or a thread pool with executor="thread".
+    """
+    domains = list(domains) if domains else list(CSV_CONFIG)
+    per_domain = per_domain or {}
+    domain_queries = domain_queries or {}
+    jobs = [(domain, domain_queries.get(domain, query), per_domain.get(domain, max_results), max_results)
+            for domain in domains]
 
-def search_stack(query, stack, max_results=MAX_RESULTS):
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        pool = _executor(executor, workers)
+        outcomes = list(pool.map(_search_domain, *zip(*jobs)))
+    else:
+        outcomes = [_search_domain(*job) for job in jobs]
+
+    by_domain = {}
+    merged = []
+    for order, (domain, (result, hits)) in enumerate(zip(domains, outcomes)):
+        by_domain[domain] = result
+        for rank, (normalized, row) in enumerate(hits):
+            merged.append((normalized, order, rank, domain, row))
+
+    results = [{"domain": domain, "score": round(normalized, 4), **row}
+               for normalized, _, _, domain, row in heapq.nsmallest(max_results, merged, key=lambda x: (-x[0], x[1], x[2]))]
+
+    return {
+        "domain": "all",
+        "query": query,
+        "domains": domains,
+        "count": len(results),
+        "results": results,
+        "by_domain": by_domain,
+        "timings": {domain: result.get("elapsed_ms") for domain, result in by_domain.items()}
+    }
+
+
+def search_stack(query, stack, max_results=MAX_RESULTS, offset=0, explain=False):
     """Search stack-specific guidelines"""
     if stack not in STACK_CONFIG:
         return {"error": f"Unknown stack: {stack}. Available: {', '.join(AVAILABLE_STACKS)}"}
@@ -246,9 +1217,10 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
     if not filepath.exists():
         return {"error": f"Stack file not found: {filepath}", "stack": stack}
 
-    results = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query, max_results)
+    results, explanations = _search_csv(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"], query,
+                                        max_results, offset, explain=explain)
 
-    return {
+    result = {
         "domain": "stack",
         "stack": stack,
         "query": query,
@@ -256,3 +1228,8 @@ def search_stack(query, stack, max_results=MAX_RESULTS):
         "count": len(results),
         "results": results
     }
+    if offset:
+        result["offset"] = offset
+    if explanations is not None:
+        result["explain"] = explanations
+    return result
@@ -8,17 +8,25 @@ Usage:
     from design_system import generate_design_system
     result = generate_design_system("SaaS dashboard", "My Project")
     
+    # Many design systems in one process, streamed as they finish
+    for item in generate_design_system_batch(["streaming home", "live tv guide"], "markdown"):
+        print(item["output"])
+
     # With persistence (Master + Overrides pattern)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True)
     result = generate_design_system("SaaS dashboard", "My Project", persist=True, page="dashboard")
 """
 
 import csv
+import hashlib
 import json
 import os
+import time
+from bisect import bisect_right
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from core import search, DATA_DIR
+from core import search, search_all, DATA_DIR, SEARCH_WORKERS
 
 
 # ============ CONFIGURATION ============
@@ -33,63 +41,155 @@ SEARCH_CONFIG = {
 }
 
 
-# ============ DESIGN SYSTEM GENERATOR ============
-class DesignSystemGenerator:
-    """Generates design system recommendations from aggregated searches."""
+# ============ REASONING INDEX ============
+class ReasoningIndex:
+    """Precompiled lookup structures over ui-reasoning.csv.
+
+    Reproduces the exact -> substring -> keyword matching order of a linear
+    scan: exact categories and keyword tokens are hash maps to the first rule
+    that has them, and "query inside a rule category" is one str.find over
+    all categories joined in rule order. Lookups go through a bounded LRU
+    cache per category; Decision_Rules JSON is parsed once.
+    """
 
-    def __init__(self):
-        self.reasoning_data = self._load_reasoning()
+    _SEPARATOR = "\x00"
 
-    def _load_reasoning(self) -> list:
-        """Load reasoning rules from CSV."""
-        filepath = DATA_DIR / REASONING_FILE
-        if not filepath.exists():
-            return []
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return list(csv.DictReader(f))
-
-    def _multi_domain_search(self, query: str, style_priority: list = None) -> dict:
-        """Execute searches across multiple domains."""
-        results = {}
-        for domain, config in SEARCH_CONFIG.items():
-            if domain == "style" and style_priority:
-                # For style, also search with priority keywords
-                priority_query = " ".join(style_priority[:2]) if style_priority else query
-                combined_query = f"{query} {priority_query}"
-                results[domain] = search(combined_query, domain, config["max_results"])
+    def __init__(self, rules: list, cache_size: int = 1024):
+        self.rules = rules
+        self.exact = {}
+        self.keywords = {}
+        self.decision_rules = []
+        self._find = lru_cache(maxsize=cache_size)(self._lookup)
+
+        categories = []
+        self._offsets = []
+        offset = 0
+        for pos, rule in enumerate(rules):
+            ui_cat = rule.get("UI_Category", "").lower()
+            categories.append(ui_cat)
+            self._offsets.append(offset)
+            offset += len(ui_cat) + 1
+            self.exact.setdefault(ui_cat, pos)
+            for kw in ui_cat.replace("/", " ").replace("-", " ").split():
+                self.keywords.setdefault(kw, pos)
+
+            try:
+                self.decision_rules.append(json.loads(rule.get("Decision_Rules", "{}")))
+            except json.JSONDecodeError:
+                self.decision_rules.append({})
+        self._haystack = self._SEPARATOR.join(categories)
+        self._exact_lengths = sorted({len(cat) for cat in self.exact})
+        self._keyword_lengths = sorted({len(kw) for kw in self.keywords})
+
+    @staticmethod
+    def _substring_hits(text: str, table: dict, lengths: list) -> list:
+        """Rule positions of every table key that occurs inside text."""
+        hits = []
+        for size in lengths:
+            if size > len(text):
+                break
+            if size == 0:
+                hits.append(table[""])
+                continue
+            for start in range(len(text) - size + 1):
+                pos = table.get(text[start:start + size])
+                if pos is not None:
+                    hits.append(pos)
+        return hits
+
+    def _first_containing(self, text: str):
+        """First rule whose category contains text, or None."""
+        if not self.rules or self._SEPARATOR in text:
+            return None
+        found = self._haystack.find(text)
+        return bisect_right(self._offsets, found) - 1 if found >= 0 else None
+
+    def find(self, category: str):
+        """Position of the matching rule for a category, or None."""
+        return self._find(category.lower())
+
+    def _lookup(self, category_lower: str):
+        """Uncached find() for an already lowercased category."""
+        # Exact match first
+        pos = self.exact.get(category_lower)
+        if pos is None:
+            # Partial match: rule category inside the query category, or vice versa
+            partial = self._substring_hits(category_lower, self.exact, self._exact_lengths)
+            containing = self._first_containing(category_lower)
+            if containing is not None:
+                partial.append(containing)
+            if partial:
+                pos = min(partial)
             else:
-                results[domain] = search(query, domain, config["max_results"])
-        return results
+                # Keyword match: any rule keyword inside the query category
+                keyword = self._substring_hits(category_lower, self.keywords, self._keyword_lengths)
+                pos = min(keyword) if keyword else None
+        return pos
 
-    def _find_reasoning_rule(self, category: str) -> dict:
-        """Find matching reasoning rule for a category."""
-        category_lower = category.lower()
 
-        # Try exact match first
-        for rule in self.reasoning_data:
-            if rule.get("UI_Category", "").lower() == category_lower:
-                return rule
+_REASONING_CACHE = {}
 
-        # Try partial match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            if ui_cat in category_lower or category_lower in ui_cat:
-                return rule
 
-        # Try keyword match
-        for rule in self.reasoning_data:
-            ui_cat = rule.get("UI_Category", "").lower()
-            keywords = ui_cat.replace("/", " ").replace("-", " ").split()
-            if any(kw in category_lower for kw in keywords):
-                return rule
+def load_reasoning_index(filepath: Path = None) -> ReasoningIndex:
+    """Load ui-reasoning.csv once per file version."""
+    filepath = filepath or DATA_DIR / REASONING_FILE
+    if not filepath.exists():
+        return ReasoningIndex([])
+    stat = filepath.stat()
+    version = (stat.st_mtime_ns, stat.st_size)
+    cached = _REASONING_CACHE.get(filepath)
+    if cached is None or cached[0] != version:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            cached = (version, ReasoningIndex(list(csv.DictReader(f))))
+        _REASONING_CACHE[filepath] = cached
+    return cached[1]
+
+
+# ============ DESIGN SYSTEM GENERATOR ============
+class DesignSystemGenerator:
+    """Generates design system recommendations from aggregated searches."""
 
-        return {}
+    def __init__(self, workers: int = SEARCH_WORKERS, executor: str = "process"):
+        self.workers = workers
+        self.executor = executor
+
+    @property
+    def reasoning(self) -> ReasoningIndex:
+        """Current reasoning rules; reloaded when ui-reasoning.csv changes."""
+        return load_reasoning_index()
+
+    def _multi_domain_search(self, query: str, style_priority: list = None, known: dict = None) -> dict:
+        """Execute searches across multiple domains in one search_all() call.
+
+        Domains already present in `known` (e.g. the product lookup done by
+        generate()) are reused instead of searched again. Each domain result
+        carries its own "elapsed_ms".
+        """
+        results = dict(known or {})
+        domain_queries = {}
+        if style_priority:
+            # For style, also search with priority keywords
+            domain_queries["style"] = f"{query} {' '.join(style_priority[:2])}"
+        domains = [d for d in SEARCH_CONFIG if d not in results]
+        per_domain = {domain: config["max_results"] for domain, config in SEARCH_CONFIG.items()}
+        if domains:
+            federated = search_all(query, domains, per_domain=per_domain, domain_queries=domain_queries,
+                                   workers=self.workers, executor=self.executor)
+            results.update(federated["by_domain"])
+        return {domain: results[domain] for domain in SEARCH_CONFIG}
+
+    def _find_reasoning_rule(self, category: str) -> dict:
+        """Find matching reasoning rule for a category."""
+        reasoning = self.reasoning
+        pos = reasoning.find(category)
+        return reasoning.rules[pos] if pos is not None else {}
 
     def _apply_reasoning(self, category: str, search_results: dict) -> dict:
         """Apply reasoning rules to search results."""
-        rule = self._find_reasoning_rule(category)
+        reasoning = self.reasoning
+        pos = reasoning.find(category)
 
-        if not rule:
+        if pos is None:
             return {
                 "pattern": "Hero + Features + CTA",
                 "style_priority": ["Minimalism", "Flat Design"],
@@ -101,13 +201,7 @@ class DesignSystemGenerator:
                 "severity": "MEDIUM"
             }
 
-        # Parse decision rules JSON
-        decision_rules = {}
-        try:
-            decision_rules = json.loads(rule.get("Decision_Rules", "{}"))
-        except json.JSONDecodeError:
-            pass
-
+        rule = reasoning.rules[pos]
         return {
             "pattern": rule.get("Recommended_Pattern", ""),
             "style_priority": [s.strip() for s in rule.get("Style_Priority", "").split("+")],
@@ -115,7 +209,7 @@ class DesignSystemGenerator:
             "typography_mood": rule.get("Typography_Mood", ""),
             "key_effects": rule.get("Key_Effects", ""),
             "anti_patterns": rule.get("Anti_Patterns", ""),
-            "decision_rules": decision_rules,
+            "decision_rules": dict(reasoning.decision_rules[pos]),
             "severity": rule.get("Severity", "MEDIUM")
         }
 
@@ -124,10 +218,8 @@ class DesignSystemGenerator:
         if not results:
             return {}
 
-        if not priority_keywords:
-            return results[0]
-
-        # First: try exact style name match
+        # Try exact style name match; otherwise trust the ranking, which
+        # already weights Style Category and Keywords hits (BM25F)
         for priority in priority_keywords:
             priority_lower = priority.lower().strip()
             for result in results:
@@ -135,26 +227,7 @@ class DesignSystemGenerator:
                 if priority_lower in style_name or style_name in priority_lower:
                     return result
 
-        # Second: score by keyword match in all fields
-        scored = []
-        for result in results:
-            result_str = str(result).lower()
-            score = 0
-            for kw in priority_keywords:
-                kw_lower = kw.lower().strip()
-                # Higher score for style name match
-                if kw_lower in result.get("Style Category", "").lower():
-                    score += 10
-                # Lower score for keyword field match
-                elif kw_lower in result.get("Keywords", "").lower():
-                    score += 3
-                # Even lower for other field matches
-                elif kw_lower in result_str:
-                    score += 1
-            scored.append((score, result))
-
-        scored.sort(key=lambda x: x[0], reverse=True)
-        return scored[0][1] if scored and scored[0][0] > 0 else results[0]
+        return results[0]
 
     def _extract_results(self, search_result: dict) -> list:
         """Extract results list from search result dict."""
@@ -174,8 +247,7 @@ class DesignSystemGenerator:
         style_priority = reasoning.get("style_priority", [])
 
         # Step 3: Multi-domain search with style priority hints
-        search_results = self._multi_domain_search(query, style_priority)
-        search_results["product"] = product_result  # Reuse product search
+        search_results = self._multi_domain_search(query, style_priority, known={"product": product_result})
 
         # Step 4: Select best matches from each domain using priority
         style_results = self._extract_results(search_results.get("style", {}))
@@ -459,47 +531,194 @@ def format_markdown(design_system: dict) -> str:
 
 
 # ============ MAIN ENTRY POINT ============
+OUTPUT_FORMATS = ["ascii", "markdown", "json"]
+
+_GENERATOR = None
+
+
+def get_generator() -> DesignSystemGenerator:
+    """Process-wide generator, so repeated calls share warm indexes and the reasoning index."""
+    global _GENERATOR
+    if _GENERATOR is None:
+        _GENERATOR = DesignSystemGenerator()
+    return _GENERATOR
+
+
+def format_design_system(design_system: dict, output_format: str = "ascii") -> str:
+    """Render a design system as "ascii" (default), "markdown" or "json"."""
+    if output_format == "markdown":
+        return format_markdown(design_system)
+    if output_format == "json":
+        return json.dumps(design_system, ensure_ascii=False)
+    return format_ascii_box(design_system)
+
+
 def generate_design_system(query: str, project_name: str = None, output_format: str = "ascii", 
-                           persist: bool = False, page: str = None, output_dir: str = None) -> str:
+                           persist: bool = False, page: str = None, output_dir: str = None,
+                           pages: list = None) -> str:
     """
     Main entry point for design system generation.
 
     Args:
         query: Search query (e.g., "SaaS dashboard", "e-commerce luxury")
         project_name: Optional project name for output header
-        output_format: "ascii" (default) or "markdown"
+        output_format: "ascii" (default), "markdown" or "json"
         persist: If True, save design system to design-system/ folder
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
+        pages: Optional list of page names, one override file each
 
     Returns:
         Formatted design system string
     """
-    generator = DesignSystemGenerator()
-    design_system = generator.generate(query, project_name)
+    design_system = get_generator().generate(query, project_name)
     
     # Persist to files if requested
     if persist:
-        persist_design_system(design_system, page, output_dir, query)
+        persist_design_system(design_system, page, output_dir, query, pages=pages)
 
-    if output_format == "markdown":
-        return format_markdown(design_system)
-    return format_ascii_box(design_system)
+    return format_design_system(design_system, output_format)
+
+
+def generate_design_system_batch(queries, output_format: str = "ascii", persist: bool = False,
+                                 output_dir: str = None, generator: DesignSystemGenerator = None):
+    """
+    Generate many design systems in one process, yielding each as it finishes.
+
+    All items share one DesignSystemGenerator, so domain indexes, the result
+    cache and the reasoning index are loaded once.
+
+    Args:
+        queries: Iterable of query strings, or dicts with "query" and optional
+                 "project_name" / "page" / "pages"
+        output_format: "ascii" (default), "markdown" or "json"
+        persist: If True, save each design system to design-system/ folder
+                 (items with "pages" are always saved)
+        output_dir: Optional output directory (defaults to current working directory)
+        generator: Optional generator to reuse (defaults to the shared one)
+
+    Yields:
+        dict with query, project_name, page, design_system, output and
+        elapsed_ms (or error)
+    """
+    generator = generator or get_generator()
+    for item in queries:
+        item = {"query": item} if isinstance(item, str) else dict(item)
+        query = item.get("query")
+        project_name = item.get("project_name")
+        page = item.get("page")
+        pages = item.get("pages")
+        start = time.perf_counter()
+        try:
+            if not query:
+                raise ValueError("Missing 'query'")
+            design_system = generator.generate(query, project_name)
+            if persist or pages:
+                persist_design_system(design_system, page, output_dir, query, pages=pages)
+            output = format_design_system(design_system, output_format)
+        except Exception as e:
+            yield {"query": query, "project_name": project_name, "page": page, "error": str(e)}
+            continue
+        yield {
+            "query": query,
+            "project_name": project_name,
+            "page": page,
+            "design_system": design_system,
+            "output": output,
+            "elapsed_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
 
 
 # ============ PERSISTENCE FUNCTIONS ============
-def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None) -> dict:
+MANIFEST_FILE = "manifest.json"
+
+
+def _content_hash(content: str) -> str:
+    """SHA-256 of rendered file content."""
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _atomic_write(path: Path, content: str):
+    """Write via a temp file + rename so readers never see a partial file."""
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+
+def _load_manifest(design_system_dir: Path) -> dict:
+    """Read the persistence manifest (empty if missing or unreadable)."""
+    try:
+        with open(design_system_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if isinstance(manifest.get("files"), dict):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {"version": 1, "files": {}}
+
+
+def _persist_file(path: Path, rel_name: str, render, query: str, manifest: dict) -> bool:
+    """
+    Write a generated file only if its content changed.
+
+    render(timestamp) returns the file content. The change check hashes the
+    content rendered without a timestamp, so re-running an identical
+    generation does not rewrite the file just to bump "Generated:". A file
+    edited or removed since the last run is always rewritten.
+
+    Returns True if the file was written.
+    """
+    content_hash = _content_hash(render(""))
+    entry = manifest["files"].get(rel_name)
+    if entry and entry.get("hash") == content_hash and path.exists():
+        try:
+            if _content_hash(path.read_text(encoding='utf-8')) == entry.get("file_hash"):
+                return False
+        except OSError:
+            pass
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    content = render(timestamp)
+    _atomic_write(path, content)
+    manifest["files"][rel_name] = {
+        "query": query,
+        "hash": content_hash,
+        "file_hash": _content_hash(content),
+        "generated": timestamp
+    }
+    return True
+
+
+def page_filename(page: str) -> str:
+    """File name of a page override (e.g. "Live TV" -> "live-tv.md")."""
+    return f"{page.lower().replace(' ', '-')}.md"
+
+
+def persist_design_system(design_system: dict, page: str = None, output_dir: str = None, page_query: str = None,
+                          pages: list = None) -> dict:
     """
     Persist design system to design-system/<project>/ folder using Master + Overrides pattern.
+
+    Files are only rewritten when their content changes (see _persist_file);
+    design-system/<project>/manifest.json records each file's query, content
+    hash and generation time.
     
     Args:
         design_system: The generated design system dictionary
         page: Optional page name for page-specific override file
         output_dir: Optional output directory (defaults to current working directory)
         page_query: Optional query string for intelligent page override generation
+        pages: Optional list of page names; every override is built from the
+               same master, and names mapping to one file are generated once
     
     Returns:
-        dict with created file paths and status
+        dict with created (written) and unchanged file paths, per-page timings
+        (ms) and status
     """
     base_dir = Path(output_dir) if output_dir else Path.cwd()
     
@@ -511,35 +730,52 @@ def persist_design_system(design_system: dict, page: str = None, output_dir: str
     pages_dir = design_system_dir / "pages"
     
     created_files = []
+    unchanged_files = []
     
     # Create directories
     design_system_dir.mkdir(parents=True, exist_ok=True)
     pages_dir.mkdir(parents=True, exist_ok=True)
     
-    master_file = design_system_dir / "MASTER.md"
+    manifest = _load_manifest(design_system_dir)
+    written = _persist_file(design_system_dir / "MASTER.md", "MASTER.md",
+                            lambda timestamp: format_master_md(design_system, timestamp), page_query, manifest)
+    (created_files if written else unchanged_files).append(str(design_system_dir / "MASTER.md"))
+    
+    # Page override files with intelligent content, one per unique file name
+    by_file = {}
+    for name in ([page] if page else []) + list(pages or []):
+        if name:
+            by_file.setdefault(page_filename(name), name)
     
-    # Generate and write MASTER.md
-    master_content = format_master_md(design_system)
-    with open(master_file, 'w', encoding='utf-8') as f:
-        f.write(master_content)
-    created_files.append(str(master_file))
+    # Every page's sub-queries include its name, so there is nothing to share
+    # between pages; each takes well under a millisecond, so they run in turn
+    timings = {}
+    for filename, name in by_file.items():
+        start = time.perf_counter()
+        overrides = _generate_intelligent_overrides(name, page_query, design_system)
+        page_written = _persist_file(
+            pages_dir / filename,
+            f"pages/{filename}",
+            lambda timestamp: format_page_override_md(design_system, name, page_query, timestamp, overrides),
+            page_query,
+            manifest
+        )
+        (created_files if page_written else unchanged_files).append(str(pages_dir / filename))
+        timings[name] = round((time.perf_counter() - start) * 1000, 3)
     
-    # If page is specified, create page override file with intelligent content
-    if page:
-        page_file = pages_dir / f"{page.lower().replace(' ', '-')}.md"
-        page_content = format_page_override_md(design_system, page, page_query)
-        with open(page_file, 'w', encoding='utf-8') as f:
-            f.write(page_content)
-        created_files.append(str(page_file))
+    if created_files:
+        _atomic_write(design_system_dir / MANIFEST_FILE, json.dumps(manifest, indent=2, ensure_ascii=False))
     
     return {
         "status": "success",
         "design_system_dir": str(design_system_dir),
-        "created_files": created_files
+        "created_files": created_files,
+        "unchanged_files": unchanged_files,
+        "timings": timings
     }
 
 
-def format_master_md(design_system: dict) -> str:
+def format_master_md(design_system: dict, timestamp: str = None) -> str:
     """Format design system as MASTER.md with hierarchical override logic."""
     project = design_system.get("project_name", "PROJECT")
     pattern = design_system.get("pattern", {})
@@ -549,7 +785,8 @@ def format_master_md(design_system: dict) -> str:
     effects = design_system.get("key_effects", "")
     anti_patterns = design_system.get("anti_patterns", "")
     
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     lines = []
     
@@ -802,14 +1039,17 @@ def format_master_md(design_system: dict) -> str:
     return "\n".join(lines)
 
 
-def format_page_override_md(design_system: dict, page_name: str, page_query: str = None) -> str:
+def format_page_override_md(design_system: dict, page_name: str, page_query: str = None,
+                            timestamp: str = None, page_overrides: dict = None) -> str:
     """Format a page-specific override file with intelligent AI-generated content."""
     project = design_system.get("project_name", "PROJECT")
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if timestamp is None:
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     page_title = page_name.replace("-", " ").replace("_", " ").title()
     
     # Detect page type and generate intelligent overrides
-    page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
+    if page_overrides is None:
+        page_overrides = _generate_intelligent_overrides(page_name, page_query, design_system)
     
     lines = []
     
@@ -918,7 +1158,6 @@ def _generate_intelligent_overrides(page_name: str, page_query: str, design_syst
     Uses the existing search infrastructure to find relevant style, UX, and layout
     data instead of hardcoded page types.
     """
-    from core import search
     
     page_lower = page_name.lower()
     query_lower = (page_query or "").lower()
@@ -1059,7 +1298,7 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate Design System")
     parser.add_argument("query", help="Search query (e.g., 'SaaS dashboard')")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format")
+    parser.add_argument("--format", "-f", choices=OUTPUT_FORMATS, default="ascii", help="Output format")
 
     args = parser.parse_args()
 
@@ -2,21 +2,54 @@
 # -*- coding: utf-8 -*-
 """
 UI/UX Pro Max Search - BM25 search engine for UI/UX style guides
-Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3]
+Usage: python search.py "<query>" [--domain <domain>] [--stack <stack>] [--max-results 3] [--offset 0] [--explain]
        python search.py "<query>" --design-system [-p "Project Name"]
        python search.py "<query>" --design-system --persist [-p "Project Name"] [--page "dashboard"]
+       python search.py "<query>" --design-system --pages home,live,vod,series,settings [-p "Project Name"]
 
-Domains: style, prompt, color, chart, landing, product, ux, typography
+Domains: style, prompt, color, chart, landing, product, ux, typography (or "all" for a federated search)
 Stacks: html-tailwind, react, nextjs
 
 Persistence (Master + Overrides pattern):
   --persist    Save design system to design-system/MASTER.md
   --page       Also create a page-specific override file in design-system/pages/
+  --pages      Create several page override files in one run (comma-separated)
+
+Daemon (warm indexes, see server.py):
+  --serve [ADDR]   Run a long-lived search server (host:port or Unix socket path)
+  --server ADDR    Forward this query to a running server instead of searching locally
+  --stats          With --server, print the server's per-request latency stats
+
+Batch (JSONL in, JSONL out):
+  --batch FILE     Run one query per line (plain text or a JSON request object,
+                   "-" for stdin); prints one JSON response per line
+  --design-system --batch FILE
+                   Generate one design system per line (plain query or
+                   {"query", "project_name", "page"}), streamed as ascii,
+                   markdown or JSON lines (--format json)
+
+Startup:
+  --startup-report Print phase timings (imports, arguments, query, output)
+                   and the slowest imports to stderr; plain searches never
+                   import json or the design-system generator
 """
 
+import sys
+import time
+
+_START = time.perf_counter()
+
+# Installed before any other import so the report can time them too
+STARTUP = None
+if "--startup-report" in sys.argv:
+    from startup_report import StartupReport
+    STARTUP = StartupReport(_START)
+
 import argparse
 from core import CSV_CONFIG, AVAILABLE_STACKS, MAX_RESULTS, search, search_stack
-from design_system import generate_design_system, persist_design_system
+
+# json, design_system (and its datetime import) and server are
+# imported where needed, so a plain domain search never loads them
 
 
 def format_output(result):
@@ -31,8 +64,10 @@ def format_output(result):
     else:
         output.append(f"## UI Pro Max Search Results")
         output.append(f"**Domain:** {result['domain']} | **Query:** {result['query']}")
-    output.append(f"**Source:** {result['file']} | **Found:** {result['count']} results\n")
+    source = result.get("file") or ", ".join(result.get("domains", []))
+    output.append(f"**Source:** {source} | **Found:** {result['count']} results\n")
 
+    explanations = result.get("explain") or []
     for i, row in enumerate(result['results'], 1):
         output.append(f"### Result {i}")
         for key, value in row.items():
@@ -40,31 +75,227 @@ def format_output(result):
             if len(value_str) > 300:
                 value_str = value_str[:300] + "..."
             output.append(f"- **{key}:** {value_str}")
+        if i <= len(explanations):
+            output.extend(format_explanation(explanations[i - 1]))
         output.append("")
 
     return "\n".join(output)
 
 
+def format_explanation(explanation):
+    """Per-term score breakdown lines for one hit (--explain)"""
+    lines = [f"- **Score:** {explanation['score']}"]
+    for term in explanation["terms"]:
+        norm = term["length_norm"]
+        if isinstance(norm, dict):
+            norm = ", ".join(f"{col} {value}" for col, value in norm.items())
+        fields = ", ".join(f"{col} x{count}" for col, count in term["fields"].items()) or "-"
+        weight = f" x{term['weight']}" if term["weight"] != 1 else ""
+        fuzzy = " (fuzzy)" if term["fuzzy"] else ""
+        lines.append(f"  - `{term['term']}`{fuzzy}{weight}: +{term['score']} "
+                     f"(tf {term['tf']}, idf {term['idf']}, length norm {norm}; fields: {fields})")
+    return lines
+
+
+def non_negative_int(value):
+    """argparse type for counts such as --offset"""
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be >= 0, got {number}")
+    return number
+
+
+def parse_pages(args):
+    """Page names from --page and the comma-separated --pages"""
+    pages = ([args.page] if args.page else []) + [p.strip() for p in (args.pages or "").split(",") if p.strip()]
+    unique = {}
+    for page in pages:
+        unique.setdefault(page.lower().replace(' ', '-'), page)
+    return list(unique.values())
+
+
+def print_persist_summary(args, report=None):
+    """Print where a persisted design system was written"""
+    project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
+    timings = (report or {}).get("timings", {})
+    print("\n" + "=" * 60)
+    print(f"✅ Design system persisted to design-system/{project_slug}/")
+    print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
+    for page in parse_pages(args):
+        page_filename = page.lower().replace(' ', '-')
+        timing = f" [{timings[page]:.1f} ms]" if page in timings else ""
+        print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides){timing}")
+    if report:
+        print(f"   ✏️  {len(report['created_files'])} written, {len(report['unchanged_files'])} unchanged")
+    print("")
+    print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
+    print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
+    print("=" * 60)
+
+
+def run_client(args):
+    """Forward the parsed request to a running search server"""
+    import json
+    from server import build_request, send_request
+
+    request = {"op": "stats"} if args.stats else build_request(args)
+    try:
+        response = send_request(args.server, request)
+    except OSError as e:
+        print(f"Error: cannot reach search server at {args.server}: {e}", file=sys.stderr)
+        sys.exit(2)
+    if not response.get("ok"):
+        print(f"Error: {response.get('error')}")
+        sys.exit(1)
+
+    result = response["result"]
+    if args.stats or args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    elif args.design_system:
+        print(result)
+    else:
+        print(format_output(result))
+
+
+def run_batch(args):
+    """Stream queries from a file or stdin through one warm process"""
+    import json
+    from server import LatencyStats, build_request, handle_request, persist_options, request_kind
+
+    defaults = dict(build_request(args), **persist_options(args))
+    stats = LatencyStats()
+    source = sys.stdin if args.batch == "-" else open(args.batch, 'r', encoding='utf-8')
+    batch_start = time.perf_counter()
+    try:
+        for line in source:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = dict(defaults)
+                request.update(json.loads(line) if line.startswith("{") else {"query": line})
+                start = time.perf_counter()
+                result = handle_request(request, allow_persist=True)
+                elapsed_ms = (time.perf_counter() - start) * 1000
+                stats.record(request_kind(request), elapsed_ms)
+                response = {"ok": True, "result": result, "elapsed_ms": round(elapsed_ms, 3)}
+            except Exception as e:
+                stats.record_error()
+                response = {"ok": False, "error": str(e)}
+            if "id" in request:
+                response["id"] = request["id"]
+            print(json.dumps(response, ensure_ascii=False), flush=True)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    summary = stats.summary()
+    summary["total_ms"] = round((time.perf_counter() - batch_start) * 1000, 3)
+    print(json.dumps(summary), file=sys.stderr)
+
+
+def run_design_system_batch(args):
+    """Generate design systems for every line of a file or stdin in one process"""
+    import json
+    from design_system import generate_design_system_batch
+
+    def items(source):
+        for line in source:
+            line = line.strip()
+            if line:
+                item = json.loads(line) if line.startswith("{") else {"query": line}
+                item.setdefault("project_name", args.project_name)
+                item.setdefault("page", args.page)
+                item.setdefault("pages", [p.strip() for p in (args.pages or "").split(",") if p.strip()])
+                yield item
+
+    source = sys.stdin if args.batch == "-" else open(args.batch, 'r', encoding='utf-8')
+    failed = 0
+    try:
+        batch = generate_design_system_batch(items(source), args.format, persist=args.persist, output_dir=args.output_dir)
+        for item in batch:
+            if args.format == "json":
+                record = {key: item[key] for key in ("query", "project_name", "page", "design_system", "elapsed_ms", "error") if key in item}
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+            elif "error" in item:
+                print(f"Error ({item['query']}): {item['error']}\n", flush=True)
+            else:
+                print(item["output"] + "\n", flush=True)
+            failed += "error" in item
+    finally:
+        if source is not sys.stdin:
+            source.close()
+    if failed:
+        sys.exit(1)
+
+
 if __name__ == "__main__":
+    if STARTUP:
+        STARTUP.mark("imports")
     parser = argparse.ArgumentParser(description="UI Pro Max Search")
-    parser.add_argument("query", help="Search query")
-    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()), help="Search domain")
+    parser.add_argument("query", nargs="?", help="Search query")
+    parser.add_argument("--domain", "-d", choices=list(CSV_CONFIG.keys()) + ["all"], help="Search domain ('all' merges every domain)")
     parser.add_argument("--stack", "-s", choices=AVAILABLE_STACKS, help="Stack-specific search (html-tailwind, react, nextjs)")
     parser.add_argument("--max-results", "-n", type=int, default=MAX_RESULTS, help="Max results (default: 3)")
+    parser.add_argument("--offset", type=non_negative_int, default=0, help="Skip the first N ranked results (pagination)")
     parser.add_argument("--json", action="store_true", help="Output as JSON")
+    parser.add_argument("--explain", action="store_true", help="Show the per-term score breakdown of every result")
     # Design system generation
     parser.add_argument("--design-system", "-ds", action="store_true", help="Generate complete design system recommendation")
     parser.add_argument("--project-name", "-p", type=str, default=None, help="Project name for design system output")
-    parser.add_argument("--format", "-f", choices=["ascii", "markdown"], default="ascii", help="Output format for design system")
+    parser.add_argument("--format", "-f", choices=["ascii", "markdown", "json"], default="ascii", help="Output format for design system")
     # Persistence (Master + Overrides pattern)
     parser.add_argument("--persist", action="store_true", help="Save design system to design-system/MASTER.md (creates hierarchical structure)")
     parser.add_argument("--page", type=str, default=None, help="Create page-specific override file in design-system/pages/")
+    parser.add_argument("--pages", type=str, default=None, help="Comma-separated pages (e.g. home,live,vod); implies --persist")
     parser.add_argument("--output-dir", "-o", type=str, default=None, help="Output directory for persisted files (default: current directory)")
+    # Daemon mode
+    parser.add_argument("--serve", nargs="?", const="127.0.0.1:8765", default=None, metavar="ADDR", help="Run a search server with warm indexes (host:port or Unix socket path)")
+    parser.add_argument("--server", type=str, default=None, metavar="ADDR", help="Send the query to a running search server")
+    parser.add_argument("--stats", action="store_true", help="With --server, print per-request latency stats")
+    # Batch mode
+    parser.add_argument("--batch", type=str, default=None, metavar="FILE", help="Run queries from a JSONL/plain-text file ('-' for stdin), one JSON result per line")
+    # Diagnostics
+    parser.add_argument("--startup-report", action="store_true", help="Print startup phase timings and the slowest imports to stderr")
 
     args = parser.parse_args()
+    if args.domain == "all" and not args.stack and (args.offset or args.explain):
+        parser.error("--offset/--explain are not supported with --domain all")
+    if STARTUP:
+        STARTUP.mark("arguments")
+
+    if args.serve:
+        from server import serve
+        serve(args.serve)
+        sys.exit(0)
+    if args.pages:
+        args.persist = True
+    if args.batch:
+        if args.design_system:
+            run_design_system_batch(args)
+        else:
+            run_batch(args)
+        sys.exit(0)
+    if args.server:
+        if not args.query and not args.stats:
+            parser.error("a query is required unless --stats is given")
+        if args.persist or args.page or args.pages:
+            parser.error("--persist/--page/--pages write files locally; run them without --server")
+        run_client(args)
+        sys.exit(0)
+    if not args.query:
+        parser.error("the following arguments are required: query")
 
     # Design system takes priority
-    if args.design_system:
+    if args.design_system and args.pages:
+        # Several page overrides from one master
+        from design_system import format_design_system, get_generator, persist_design_system
+        design_system = get_generator().generate(args.query, args.project_name)
+        report = persist_design_system(design_system, None, args.output_dir, args.query, pages=parse_pages(args))
+        print(format_design_system(design_system, args.format))
+        print_persist_summary(args, report)
+    elif args.design_system:
+        from design_system import generate_design_system
         result = generate_design_system(
             args.query, 
             args.project_name, 
@@ -77,30 +308,21 @@ if __name__ == "__main__":
         
         # Print persistence confirmation
         if args.persist:
-            project_slug = args.project_name.lower().replace(' ', '-') if args.project_name else "default"
-            print("\n" + "=" * 60)
-            print(f"✅ Design system persisted to design-system/{project_slug}/")
-            print(f"   📄 design-system/{project_slug}/MASTER.md (Global Source of Truth)")
-            if args.page:
-                page_filename = args.page.lower().replace(' ', '-')
-                print(f"   📄 design-system/{project_slug}/pages/{page_filename}.md (Page Overrides)")
-            print("")
-            print(f"📖 Usage: When building a page, check design-system/{project_slug}/pages/[page].md first.")
-            print(f"   If exists, its rules override MASTER.md. Otherwise, use MASTER.md.")
-            print("=" * 60)
-    # Stack search
-    elif args.stack:
-        result = search_stack(args.query, args.stack, args.max_results)
-        if args.json:
-            import json
-            print(json.dumps(result, indent=2, ensure_ascii=False))
-        else:
-            print(format_output(result))
-    # Domain search
+            print_persist_summary(args)
+    # Stack or domain search
     else:
-        result = search(args.query, args.domain, args.max_results)
+        if args.stack:
+            result = search_stack(args.query, args.stack, args.max_results, args.offset, args.explain)
+        else:
+            result = search(args.query, args.domain, args.max_results, args.offset, args.explain)
+        if STARTUP:
+            STARTUP.mark("query")
         if args.json:
             import json
             print(json.dumps(result, indent=2, ensure_ascii=False))
         else:
             print(format_output(result))
+
+    if STARTUP:
+        STARTUP.mark("output")
+        STARTUP.print()
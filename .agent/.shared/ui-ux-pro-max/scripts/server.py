@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Server - Long-lived search daemon with warm indexes
+
+Protocol: one JSON object per line over a Unix socket or localhost TCP,
+answered by one JSON object per line.
+
+Request:  {"query": "...", "domain": "style", "stack": null, "max_results": 3,
+           "offset": 0, "explain": false, "design_system": false, "project_name": null, "format": "ascii"}
+          {"op": "stats"} | {"op": "ping"}
+Response: {"ok": true, "result": ..., "elapsed_ms": 0.42}
+          {"ok": false, "error": "..."}
+
+The server is read-only: it never writes design-system files for a client
+(--persist / --pages run locally), and it only stops on Ctrl-C or SIGTERM
+from its owner. Unix sockets are created owner-only (0600).
+
+Usage:
+    python search.py --serve [127.0.0.1:8765 | /tmp/uipro.sock]
+    python search.py "<query>" --server 127.0.0.1:8765 [--domain style]
+    python search.py --server 127.0.0.1:8765 --stats
+"""
+
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from core import CSV_CONFIG, STACK_CONFIG, _STACK_COLS, DATA_DIR, MAX_RESULTS, cache_stats, load_index, search, search_stack
+
+DEFAULT_ADDRESS = "127.0.0.1:8765"
+CLIENT_TIMEOUT = 30
+
+
+# ============ REQUEST DISPATCH ============
+def handle_request(request: dict, allow_persist: bool = False):
+    """Run one search / stack search / design-system request and return its result.
+
+    Design-system persistence (persist / page / pages / output_dir) is only
+    honoured with allow_persist, i.e. for the caller's own in-process batches.
+    """
+    query = request.get("query")
+    if not query:
+        raise ValueError("Missing 'query'")
+    max_results = int(request.get("max_results") or MAX_RESULTS)
+    offset = int(request.get("offset") or 0)
+
+    if request.get("design_system"):
+        from design_system import generate_design_system
+        return generate_design_system(
+            query,
+            request.get("project_name"),
+            request.get("format", "ascii"),
+            persist=allow_persist and bool(request.get("persist")),
+            page=request.get("page"),
+            output_dir=request.get("output_dir"),
+            pages=request.get("pages"),
+        )
+    explain = bool(request.get("explain"))
+    if request.get("stack"):
+        return search_stack(query, request["stack"], max_results, offset, explain)
+    return search(query, request.get("domain"), max_results, offset, explain)
+
+
+def request_kind(request: dict) -> str:
+    """Latency bucket for a request."""
+    if request.get("design_system"):
+        return "design_system"
+    if request.get("stack"):
+        return "stack"
+    return "search"
+
+
+def warm_indexes() -> int:
+    """Load every domain and stack index so the first request is already warm."""
+    count = 0
+    for config in CSV_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            load_index(filepath, config["search_cols"], config["output_cols"], config.get("field_weights"))
+            count += 1
+    for config in STACK_CONFIG.values():
+        filepath = DATA_DIR / config["file"]
+        if filepath.exists():
+            load_index(filepath, _STACK_COLS["search_cols"], _STACK_COLS["output_cols"])
+            count += 1
+    return count
+
+
+# ============ LATENCY STATS ============
+class LatencyStats:
+    """Thread-safe per-request-kind latency recorder."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(list)
+        self.errors = 0
+
+    def record(self, kind: str, elapsed_ms: float):
+        with self._lock:
+            self._samples[kind].append(elapsed_ms)
+
+    def record_error(self):
+        with self._lock:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        def percentile(values, pct):
+            return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+        with self._lock:
+            summary = {"errors": self.errors, "kinds": {}}
+            for kind, samples in self._samples.items():
+                values = sorted(samples)
+                summary["kinds"][kind] = {
+                    "count": len(values),
+                    "mean_ms": round(sum(values) / len(values), 3),
+                    "p50_ms": round(percentile(values, 50), 3),
+                    "p95_ms": round(percentile(values, 95), 3),
+                    "p99_ms": round(percentile(values, 99), 3),
+                    "max_ms": round(values[-1], 3),
+                }
+            return summary
+
+
+# ============ SERVER ============
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            line = line.strip()
+            if not line:
+                continue
+            response = self.server.respond(line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class _ServerMixin:
+    """Shared state for the TCP and Unix socket servers."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def respond(self, line: bytes) -> dict:
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+        except ValueError as e:
+            self.stats.record_error()
+            return {"ok": False, "error": f"Invalid request: {e}"}
+
+        op = request.get("op", "search")
+        if op == "ping":
+            return {"ok": True, "result": "pong"}
+        if op == "stats":
+            return {"ok": True, "result": dict(self.stats.summary(), result_cache=cache_stats())}
+        if op != "search":
+            self.stats.record_error()
+            return {"ok": False, "error": f"Unknown op: {op}"}
+
+        start = time.perf_counter()
+        try:
+            result = handle_request(request)
+        except Exception as e:
+            self.stats.record_error()
+            return {"ok": False, "error": str(e)}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.stats.record(request_kind(request), elapsed_ms)
+        return {"ok": True, "result": result, "elapsed_ms": round(elapsed_ms, 3)}
+
+
+class _TCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    pass
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+else:
+    _UnixServer = None
+
+
+def parse_address(address: str):
+    """'host:port' -> (host, port) for TCP, anything else is a Unix socket path."""
+    host, sep, port = address.rpartition(":")
+    if sep and port.isdigit():
+        return (host or "127.0.0.1", int(port))
+    return address
+
+
+def _remove_socket(path: str):
+    """Delete a leftover Unix socket file; refuse to touch anything else."""
+    try:
+        mode = os.lstat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise SystemExit(f"{path} exists and is not a socket; refusing to replace it")
+    os.unlink(path)
+
+
+def serve(address: str = DEFAULT_ADDRESS, warm: bool = True):
+    """Run the daemon until interrupted (Ctrl-C or SIGTERM)."""
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        server = _TCPServer(target, _RequestHandler)
+    else:
+        if _UnixServer is None:
+            raise SystemExit("Unix sockets are not supported on this platform; use host:port")
+        _remove_socket(target)
+        umask = os.umask(0o177)
+        try:
+            server = _UnixServer(target, _RequestHandler)
+        finally:
+            os.umask(umask)
+    server.stats = LatencyStats()
+    # shutdown() waits for serve_forever(), so it cannot run in the handler's thread
+    signal.signal(signal.SIGTERM, lambda signum, frame: threading.Thread(target=server.shutdown, daemon=True).start())
+
+    start = time.perf_counter()
+    count = warm_indexes() if warm else 0
+    print(f"UI Pro Max search server on {address} ({count} indexes warm in "
+          f"{(time.perf_counter() - start) * 1000:.1f} ms)", flush=True)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if not isinstance(target, tuple):
+            _remove_socket(target)
+        print(json.dumps(server.stats.summary(), indent=2), flush=True)
+
+
+# ============ CLIENT ============
+def send_request(address: str, request: dict, timeout: float = CLIENT_TIMEOUT) -> dict:
+    """Forward one request to a running server and return its response."""
+    target = parse_address(address)
+    if isinstance(target, tuple):
+        sock = socket.create_connection(target, timeout=timeout)
+    else:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        sock.connect(target)
+    with sock, sock.makefile("rwb") as stream:
+        stream.write(json.dumps(request, ensure_ascii=False).encode("utf-8") + b"\n")
+        stream.flush()
+        line = stream.readline()
+    if not line:
+        return {"ok": False, "error": "Server closed the connection"}
+    return json.loads(line)
+
+
+def build_request(args) -> dict:
+    """Translate parsed search.py arguments into a server request."""
+    return {
+        "query": args.query,
+        "domain": args.domain,
+        "stack": args.stack,
+        "max_results": args.max_results,
+        "offset": args.offset,
+        "explain": args.explain,
+        "design_system": args.design_system,
+        "project_name": args.project_name,
+        "format": args.format,
+    }
+
+
+def persist_options(args) -> dict:
+    """Design-system persistence fields for in-process batches (never sent to a server)."""
+    return {
+        "persist": args.persist or bool(args.pages),
+        "page": args.page,
+        "pages": [p.strip() for p in (args.pages or "").split(",") if p.strip()] or None,
+        "output_dir": str(Path(args.output_dir or Path.cwd()).resolve()) if args.persist or args.pages else None,
+    }
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UI/UX Pro Max Startup Report - Where a cold search.py run spends its time
+
+Enabled by `python search.py "<query>" --startup-report`. Prints to stderr,
+after the normal output, the wall time of each startup phase and the
+slowest module imports (cumulative, nested like `python -X importtime`).
+"""
+
+import builtins
+import sys
+import time
+
+TOP_IMPORTS = 15
+
+
+class StartupReport:
+    """Phase timer plus an import hook that times first-time module loads"""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+        self.imports = []
+        self._last = self.start
+        self._depth = 0
+        self._seq = 0
+        self._import = builtins.__import__
+        builtins.__import__ = self._timed_import
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        if level or name in sys.modules:
+            return self._import(name, globals, locals, fromlist, level)
+        depth, seq = self._depth, self._seq
+        self._depth += 1
+        self._seq += 1
+        start = time.perf_counter()
+        try:
+            return self._import(name, globals, locals, fromlist, level)
+        finally:
+            self._depth = depth
+            self.imports.append((seq, depth, name, (time.perf_counter() - start) * 1000))
+
+    def mark(self, phase):
+        """Close the current phase under the given name"""
+        now = time.perf_counter()
+        self.phases.append((phase, (now - self._last) * 1000))
+        self._last = now
+
+    def format(self):
+        builtins.__import__ = self._import
+        total = (self._last - self.start) * 1000
+        lines = ["", "Startup report (ms since search.py started)"]
+        for phase, elapsed in self.phases:
+            lines.append(f"  {phase:<12} {elapsed:8.2f}")
+        lines.append(f"  {'total':<12} {total:8.2f}")
+        lines.append(f"  {len(sys.modules)} modules loaded")
+
+        slowest = sorted(self.imports, key=lambda record: -record[3])[:TOP_IMPORTS]
+        lines.append("Slowest imports (cumulative):")
+        for _, depth, name, elapsed in sorted(slowest):
+            lines.append(f"  {elapsed:8.2f}  {'  ' * depth}{name}")
+        return "\n".join(lines)
+
+    def print(self):
+        print(self.format(), file=sys.stderr, flush=True)
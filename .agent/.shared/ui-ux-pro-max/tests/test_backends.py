@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BM25 backend equivalence: the NumPy sparse-matrix backend must score and
+rank exactly like the pure-Python postings backend.
+
+Run: python -m unittest discover -s .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import random
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from core import BM25, _load_numpy  # noqa: E402
+
+WORDS = ["glass", "minimal", "dashboard", "gradient", "brutalism", "neumorphism", "dark", "light",
+         "saas", "fintech", "playful", "corporate", "accessible", "motion", "retro", "elegant",
+         "vibrant", "pastel", "monochrome", "editorial", "bento", "grid", "card", "hero"]
+QUERIES = ["glass dashboard", "dark minimal saas", "retro", "playful pastel card", "bento grid hero",
+           "fintech corporate accessible", "unknownword", "glassy dashbord", "elegnt editorial"]
+
+
+def _corpus(seed=7, size=300):
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) for _ in range(size)]
+
+
+@unittest.skipIf(_load_numpy() is None, "NumPy is not installed")
+class BackendEquivalenceTest(unittest.TestCase):
+
+    def _pair(self, documents, field_weights=None, fuzzy=False):
+        backends = []
+        for backend in ("python", "numpy"):
+            bm25 = BM25(backend=backend, fuzzy=fuzzy)
+            bm25.fit(documents, field_weights)
+            backends.append(bm25)
+        return backends
+
+    def assertSameRankings(self, python_bm25, numpy_bm25):
+        for query in QUERIES:
+            with self.subTest(query=query):
+                self.assertEqual(sorted(python_bm25.score(query)), sorted(numpy_bm25.score(query)))
+                for k, offset in ((1, 0), (5, 0), (10, 3), (1000, 0)):
+                    self.assertEqual(python_bm25.top_k(query, k, offset), numpy_bm25.top_k(query, k, offset))
+        self.assertIsNotNone(numpy_bm25._vector_weights(), "numpy backend fell back to python")
+
+    def test_plain_bm25(self):
+        self.assertSameRankings(*self._pair(_corpus()))
+
+    def test_field_weighted_bm25f(self):
+        documents = _corpus()
+        fields = [(doc.split()[0], doc) for doc in documents]
+        self.assertSameRankings(*self._pair(fields, field_weights=[3.0, 1.0]))
+
+    def test_fuzzy_expansion(self):
+        self.assertSameRankings(*self._pair(_corpus(seed=11), fuzzy=True))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+--explain: every explained term names the search columns it matched, for
+plain BM25 and BM25F domains alike.
+
+Run: python -m unittest discover -s .agent/.shared/ui-ux-pro-max/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from core import CSV_CONFIG, DATA_DIR, STACK_CONFIG, _STACK_COLS, load_index, search, search_stack  # noqa: E402
+
+TERMS_PER_INDEX = 25
+
+
+def _sample_terms(config):
+    """Spread of vocabulary terms from one index, covering every search column"""
+    index = load_index(DATA_DIR / config["file"], config["search_cols"], config["output_cols"],
+                       config.get("field_weights"))
+    vocabulary = sorted(index.bm25.idf)
+    step = max(1, len(vocabulary) // TERMS_PER_INDEX)
+    return vocabulary[::step]
+
+
+class ExplainFieldsTest(unittest.TestCase):
+
+    def assertFieldsNamed(self, result, search_cols):
+        self.assertNotIn("error", result)
+        for explanation in result["explain"]:
+            for entry in explanation["terms"]:
+                self.assertTrue(entry["fields"], f"no fields for term {entry['term']!r}")
+                self.assertLessEqual(set(entry["fields"]), set(search_cols))
+
+    def test_domains(self):
+        for domain, config in CSV_CONFIG.items():
+            for term in _sample_terms(config):
+                with self.subTest(domain=domain, term=term):
+                    result = search(term, domain, max_results=5, explain=True)
+                    self.assertTrue(result["results"])
+                    self.assertFieldsNamed(result, config["search_cols"])
+
+    def test_stacks(self):
+        for stack, config in STACK_CONFIG.items():
+            for term in _sample_terms(dict(config, **_STACK_COLS)):
+                with self.subTest(stack=stack, term=term):
+                    result = search_stack(term, stack, max_results=5, explain=True)
+                    self.assertTrue(result["results"])
+                    self.assertFieldsNamed(result, _STACK_COLS["search_cols"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,7 +3,7 @@
 Skill: vulnerability-scanner
 Script: security_scan.py
 Purpose: Validate that security principles from SKILL.md are applied correctly
-Usage: python security_scan.py <project_path> [--scan-type all|deps|secrets|patterns|config]
+Usage: python security_scan.py <project_path> [--scan-type all|deps|secrets|patterns|config] [--jobs N] [--no-cache]
 Output: JSON with validation findings
 
 This script verifies:
@@ -15,11 +15,15 @@ This script verifies:
 import subprocess
 import json
 import os
+import hashlib
 import sys
 import re
 import argparse
+import time
+from multiprocessing import Pool
+from bisect import bisect_right
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
 # Fix Windows console encoding for Unicode output
@@ -85,9 +89,248 @@ DANGEROUS_PATTERNS = [
     (r'yaml\.load\s*\([^)]*\)(?!\s*,\s*Loader)', "Unsafe YAML load", "high", "Deserialization risk"),
 ]
 
+CONFIG_PATTERNS = [
+    (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
+    (r'debug\s*=\s*True', "Debug mode enabled", "high"),
+    (r'NODE_ENV.*development', "Development mode in config", "medium"),
+    (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
+    (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
+    (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
+]
+
 SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '__pycache__', '.venv', 'venv', '.next'}
 CODE_EXTENSIONS = {'.js', '.ts', '.jsx', '.tsx', '.py', '.go', '.java', '.rb', '.php'}
 CONFIG_EXTENSIONS = {'.json', '.yaml', '.yml', '.toml', '.env', '.env.local', '.env.development'}
+CONFIG_FILENAMES = {'next.config.js', 'webpack.config.js', '.eslintrc.js'}
+JOB_BATCH_FILES = 64  # files per work item sent to a --jobs worker
+
+# Per-file findings of the last scan of each project, replayed for files
+# whose content hash shows they are unchanged
+CACHE_DIR = Path(os.environ.get("SECURITY_SCAN_CACHE_DIR", Path(__file__).parent.parent / ".cache"))
+CACHE_FORMAT_VERSION = 2
+
+
+# ============================================================================
+#  COMPILED PATTERN TABLES
+# ============================================================================
+
+def _line_bounded(pattern: str) -> str:
+    """
+    Rewrite a pattern so no match can span a newline: \\s outside a class
+    becomes [^\\S\\n] and negated classes also exclude \\n. On a whole
+    buffer the result matches exactly where the original matches per line
+    (the tables use no ^, $ or \\b anchors).
+    """
+    out = []
+    i = 0
+    in_class = negated = False
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            escape = pattern[i:i + 2]
+            out.append("[^\\S\\n]" if escape == "\\s" and not in_class else escape)
+            i += 2
+            continue
+        if in_class:
+            if char == "]" and not (negated and out[-1] == "[^") and out[-1] != "[":
+                if negated:
+                    out.append("\\n")
+                in_class = False
+        elif char == "[":
+            in_class = True
+            negated = pattern[i + 1:i + 2] == "^"
+            if negated:
+                out.append("[^")
+                i += 2
+                continue
+        out.append(char)
+        i += 1
+    return "".join(out)
+
+
+def _skip_class(pattern: str, i: int) -> int:
+    """Index just past the character class starting at pattern[i] == '['."""
+    i += 1
+    if pattern[i:i + 1] == "^":
+        i += 1
+    if pattern[i:i + 1] == "]":
+        i += 1
+    while i < len(pattern) and pattern[i] != "]":
+        i += 2 if pattern[i] == "\\" else 1
+    return i + 1
+
+
+def _skip_group(pattern: str, i: int) -> int:
+    """Index just past the group starting at pattern[i] == '('."""
+    depth = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "[":
+            i = _skip_class(pattern, i)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return i
+
+
+def _required_literals(pattern: str) -> List[str]:
+    """
+    Lowercase literals of which every match of `pattern` contains at least
+    one: the longest required literal run, or a group of literal alternatives
+    such as (mongodb|postgres) when that is longer. Empty if none is found.
+    """
+    candidates = []  # lists of alternatives
+    run = ""
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        literal = alternatives = None
+        if char == "|":
+            return []  # top-level alternation: no single requirement
+        if char == "\\":
+            escape = pattern[i + 1:i + 2]
+            literal = escape if escape and not escape.isalnum() else None
+            i += 2
+        elif char == "[":
+            i = _skip_class(pattern, i)
+        elif char == "(":
+            end = _skip_group(pattern, i)
+            body = pattern[i + 1:end - 1]
+            if body.startswith("?:"):
+                body = body[2:]
+            if not body.startswith("?"):
+                options = body.split("|")
+                if all(option and re.fullmatch(r"[\w\- ]+", option) for option in options):
+                    alternatives = options
+            i = end
+        elif char in ".^$":
+            i += 1
+        else:
+            literal = char
+            i += 1
+
+        # Quantifier on the token just read
+        quantifier = pattern[i:i + 1]
+        optional = quantifier in ("?", "*") or (quantifier == "{" and pattern[i + 1:i + 2] in ("0", ","))
+        if quantifier in ("?", "*", "+", "{"):
+            i = pattern.index("}", i) + 1 if quantifier == "{" else i + 1
+            if pattern[i:i + 1] == "?":
+                i += 1
+        else:
+            quantifier = ""
+
+        if literal is not None and not optional:
+            run += literal
+            if quantifier:  # repeated: the run cannot continue past it
+                candidates.append([run])
+                run = ""
+            continue
+        if run:
+            candidates.append([run])
+            run = ""
+        if alternatives and not optional:
+            candidates.append(alternatives)
+    if run:
+        candidates.append([run])
+
+    if not candidates:
+        return []
+    best = max(candidates, key=lambda options: min(len(option) for option in options))
+    return [option.lower() for option in best]
+
+
+# Compiled once at import, each with the literals a match must contain
+# (checked with plain substring search before the regex runs). Each rule
+# stays its own regex: CPython's re has no DFA, so one big alternation loses
+# the per-rule literal-prefix scan and is slower than running the rules one
+# after another over the whole buffer.
+COMPILED_SECRETS = [(re.compile(p, re.IGNORECASE), _required_literals(p), t, sev)
+                    for p, t, sev in SECRET_PATTERNS]
+COMPILED_DANGEROUS = [(re.compile(_line_bounded(p), re.IGNORECASE), _required_literals(p), name, sev, cat)
+                      for p, name, sev, cat in DANGEROUS_PATTERNS]
+COMPILED_CONFIG = [(re.compile(p, re.IGNORECASE), _required_literals(p), issue, sev)
+                   for p, issue, sev in CONFIG_PATTERNS]
+# Cached findings are only valid for the rule tables that produced them
+RULES_DIGEST = hashlib.sha1(repr((CACHE_FORMAT_VERSION, SECRET_PATTERNS, DANGEROUS_PATTERNS,
+                                  CONFIG_PATTERNS)).encode()).hexdigest()
+ANCHOR_LITERALS = sorted({literal for table in (COMPILED_SECRETS, COMPILED_DANGEROUS, COMPILED_CONFIG)
+                          for _, literals, *_ in table for literal in literals})
+
+_NEWLINE = re.compile("\n")
+
+
+class FileBuffer:
+    """
+    One file's text, shared by every scanner. The lowercased copy, the set
+    of anchor literals it contains (one substring search per literal over
+    the whole buffer) and the newline offset index are computed on first use.
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+        self._lowered = None
+        self._anchors = None
+        self._newlines = None
+
+    @property
+    def lowered(self) -> str:
+        if self._lowered is None:
+            self._lowered = self.text.lower()
+        return self._lowered
+
+    @property
+    def anchors(self) -> Optional[set]:
+        """Anchor literals present, or None when the prefilter cannot be trusted."""
+        if self._anchors is None:
+            # lower() only mirrors re.IGNORECASE offset-for-offset on ASCII
+            if not self.text.isascii():
+                return None
+            self._anchors = {literal for literal in ANCHOR_LITERALS if literal in self.lowered}
+        return self._anchors
+
+    def may_match(self, literals: List[str]) -> bool:
+        """False only when a rule with these required literals cannot match."""
+        anchors = self.anchors
+        return anchors is None or not literals or any(literal in anchors for literal in literals)
+
+    @property
+    def newlines(self) -> List[int]:
+        if self._newlines is None:
+            self._newlines = [m.start() for m in _NEWLINE.finditer(self.text)]
+        return self._newlines
+
+    def line_span(self, line_index: int) -> Tuple[int, int]:
+        """(start, end) offsets of a 0-based line, without its newline."""
+        newlines = self.newlines
+        start = newlines[line_index - 1] + 1 if line_index else 0
+        end = newlines[line_index] if line_index < len(newlines) else len(self.text)
+        return start, end
+
+    def anchor_lines(self, literals: List[str]) -> Optional[List[int]]:
+        """Sorted 0-based lines holding any of the literals, or None to scan everything."""
+        if self.anchors is None or not literals:
+            return None
+        lowered, newlines = self.lowered, self.newlines
+        lines = set()
+        for literal in literals:
+            if literal not in self._anchors:
+                continue
+            pos = lowered.find(literal)
+            while pos != -1:
+                line_index = bisect_right(newlines, pos)
+                lines.add(line_index)
+                # Skip to the next line: one hit per line is enough
+                next_pos = newlines[line_index] + 1 if line_index < len(newlines) else len(lowered)
+                pos = lowered.find(literal, next_pos)
+        return sorted(lines)
 
 
 # ============================================================================
@@ -178,198 +421,435 @@ def scan_dependencies(project_path: str) -> Dict[str, Any]:
     return results
 
 
-def scan_secrets(project_path: str) -> Dict[str, Any]:
+class FileScanner:
+    """
+    Plug-in for the shared file walk (see scan_files).
+    A scanner claims files by name/extension; each claimed file's FileBuffer
+    is read once and shared with every other scanner. scan() must not touch
+    scanner state, as it may run in a worker process: its findings are
+    handed back to add() in walk order.
+    """
+    key = ""   # --scan-type value
+    name = ""  # section name in the report
+
+    def wants(self, filename: str, ext: str) -> bool:
+        raise NotImplementedError
+
+    def scan(self, rel_path: str, buffer: FileBuffer) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def add(self, findings: List[Dict[str, Any]]) -> None:
+        self.results["findings"].extend(findings)
+
+    def report(self, project_path: str) -> Dict[str, Any]:
+        raise NotImplementedError
+
+
+class SecretScanner(FileScanner):
     """
     Validate no hardcoded secrets (OWASP A04).
     Checks: API keys, tokens, passwords, cloud credentials.
     """
-    results = {
-        "tool": "secret_scanner",
-        "findings": [],
-        "status": "[OK] No secrets detected",
-        "scanned_files": 0,
-        "by_severity": {"critical": 0, "high": 0, "medium": 0}
-    }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS and ext not in CONFIG_EXTENSIONS:
+    key = "secrets"
+    name = "secrets"
+
+    def __init__(self):
+        self.results = {
+            "tool": "secret_scanner",
+            "findings": [],
+            "status": "[OK] No secrets detected",
+            "scanned_files": 0,
+            "by_severity": {"critical": 0, "high": 0, "medium": 0}
+        }
+
+    def wants(self, filename: str, ext: str) -> bool:
+        if ext not in CODE_EXTENSIONS and ext not in CONFIG_EXTENSIONS:
+            return False
+        self.results["scanned_files"] += 1
+        return True
+
+    def scan(self, rel_path: str, buffer: FileBuffer) -> List[Dict[str, Any]]:
+        findings = []
+        for regex, literals, secret_type, severity in COMPILED_SECRETS:
+            if not buffer.may_match(literals):
                 continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, secret_type, severity in SECRET_PATTERNS:
-                        matches = re.findall(pattern, content, re.IGNORECASE)
-                        if matches:
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "type": secret_type,
-                                "severity": severity,
-                                "count": len(matches)
-                            })
-                            results["by_severity"][severity] += len(matches)
-                            
-            except Exception:
-                pass
-    
-    if results["by_severity"]["critical"] > 0:
-        results["status"] = "[!!] CRITICAL: Secrets exposed!"
-    elif results["by_severity"]["high"] > 0:
-        results["status"] = "[!] HIGH: Secrets found"
-    elif sum(results["by_severity"].values()) > 0:
-        results["status"] = "[?] Potential secrets detected"
-    
-    # Limit findings for output
-    results["findings"] = results["findings"][:15]
-    
-    return results
+            matches = regex.findall(buffer.text)
+            if matches:
+                findings.append({
+                    "file": rel_path,
+                    "type": secret_type,
+                    "severity": severity,
+                    "count": len(matches)
+                })
+        return findings
 
+    def add(self, findings: List[Dict[str, Any]]) -> None:
+        for finding in findings:
+            self.results["findings"].append(finding)
+            self.results["by_severity"][finding["severity"]] += finding["count"]
 
-def scan_code_patterns(project_path: str) -> Dict[str, Any]:
+    def report(self, project_path: str) -> Dict[str, Any]:
+        results = self.results
+        if results["by_severity"]["critical"] > 0:
+            results["status"] = "[!!] CRITICAL: Secrets exposed!"
+        elif results["by_severity"]["high"] > 0:
+            results["status"] = "[!] HIGH: Secrets found"
+        elif sum(results["by_severity"].values()) > 0:
+            results["status"] = "[?] Potential secrets detected"
+
+        # Limit findings for output
+        results["findings"] = results["findings"][:15]
+
+        return results
+
+
+class PatternScanner(FileScanner):
     """
     Validate dangerous code patterns (OWASP A05).
     Checks: Injection risks, XSS, unsafe deserialization.
     """
-    results = {
-        "tool": "pattern_scanner",
-        "findings": [],
-        "status": "[OK] No dangerous patterns",
-        "scanned_files": 0,
-        "by_category": {}
-    }
-    
-    for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CODE_EXTENSIONS:
+    key = "patterns"
+    name = "code_patterns"
+
+    def __init__(self):
+        self.results = {
+            "tool": "pattern_scanner",
+            "findings": [],
+            "status": "[OK] No dangerous patterns",
+            "scanned_files": 0,
+            "by_category": {}
+        }
+
+    def wants(self, filename: str, ext: str) -> bool:
+        if ext not in CODE_EXTENSIONS:
+            return False
+        self.results["scanned_files"] += 1
+        return True
+
+    def scan(self, rel_path: str, buffer: FileBuffer) -> List[Dict[str, Any]]:
+        content = buffer.text
+        hits = set()
+        # Rules are line-bounded, so each match belongs to exactly one line.
+        # A rule runs only on the lines holding one of its anchor literals,
+        # or over the whole buffer when the prefilter does not apply.
+        for rule, (regex, literals, _, _, _) in enumerate(COMPILED_DANGEROUS):
+            if not buffer.may_match(literals):
                 continue
-                
-            filepath = Path(root) / file
-            results["scanned_files"] += 1
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    lines = f.readlines()
-                    
-                    for line_num, line in enumerate(lines, 1):
-                        for pattern, name, severity, category in DANGEROUS_PATTERNS:
-                            if re.search(pattern, line, re.IGNORECASE):
-                                results["findings"].append({
-                                    "file": str(filepath.relative_to(project_path)),
-                                    "line": line_num,
-                                    "pattern": name,
-                                    "severity": severity,
-                                    "category": category,
-                                    "snippet": line.strip()[:80]
-                                })
-                                results["by_category"][category] = results["by_category"].get(category, 0) + 1
-                                
-            except Exception:
-                pass
-    
-    critical_count = sum(1 for f in results["findings"] if f["severity"] == "critical")
-    high_count = sum(1 for f in results["findings"] if f["severity"] == "high")
-    
-    if critical_count > 0:
-        results["status"] = f"[!!] CRITICAL: {critical_count} dangerous patterns"
-    elif high_count > 0:
-        results["status"] = f"[!] HIGH: {high_count} risky patterns"
-    elif results["findings"]:
-        results["status"] = "[?] Some patterns need review"
-    
-    # Limit findings
-    results["findings"] = results["findings"][:20]
-    
-    return results
+            lines = buffer.anchor_lines(literals)
+            if lines is None:
+                for match in regex.finditer(content):
+                    hits.add((bisect_right(buffer.newlines, match.start()), rule))
+                continue
+            for line_index in lines:
+                start, end = buffer.line_span(line_index)
+                if regex.search(content, start, end):
+                    hits.add((line_index, rule))
 
+        # Same order as a line-by-line scan: by line, then rule
+        findings = []
+        for line_index, rule in sorted(hits):
+            _, _, name, severity, category = COMPILED_DANGEROUS[rule]
+            start, end = buffer.line_span(line_index)
+            findings.append({
+                "file": rel_path,
+                "line": line_index + 1,
+                "pattern": name,
+                "severity": severity,
+                "category": category,
+                "snippet": content[start:end].strip()[:80]
+            })
+        return findings
 
-def scan_configuration(project_path: str) -> Dict[str, Any]:
+    def add(self, findings: List[Dict[str, Any]]) -> None:
+        by_category = self.results["by_category"]
+        for finding in findings:
+            self.results["findings"].append(finding)
+            by_category[finding["category"]] = by_category.get(finding["category"], 0) + 1
+
+    def report(self, project_path: str) -> Dict[str, Any]:
+        results = self.results
+        critical_count = sum(1 for f in results["findings"] if f["severity"] == "critical")
+        high_count = sum(1 for f in results["findings"] if f["severity"] == "high")
+
+        if critical_count > 0:
+            results["status"] = f"[!!] CRITICAL: {critical_count} dangerous patterns"
+        elif high_count > 0:
+            results["status"] = f"[!] HIGH: {high_count} risky patterns"
+        elif results["findings"]:
+            results["status"] = "[?] Some patterns need review"
+
+        # Limit findings
+        results["findings"] = results["findings"][:20]
+
+        return results
+
+
+class ConfigScanner(FileScanner):
     """
     Validate security configuration (OWASP A02).
     Checks: Security headers, CORS, debug modes.
     """
-    results = {
-        "tool": "config_scanner",
-        "findings": [],
-        "status": "[OK] Configuration secure",
-        "checks": {}
-    }
-    
-    # Check common config files for issues
-    config_issues = [
-        (r'"DEBUG"\s*:\s*true', "Debug mode enabled", "high"),
-        (r'debug\s*=\s*True', "Debug mode enabled", "high"),
-        (r'NODE_ENV.*development', "Development mode in config", "medium"),
-        (r'"CORS_ALLOW_ALL".*true', "CORS allow all origins", "high"),
-        (r'"Access-Control-Allow-Origin".*\*', "CORS wildcard", "high"),
-        (r'allowCredentials.*true.*origin.*\*', "Dangerous CORS combo", "critical"),
-    ]
-    
+    key = "config"
+    name = "configuration"
+
+    def __init__(self):
+        self.results = {
+            "tool": "config_scanner",
+            "findings": [],
+            "status": "[OK] Configuration secure",
+            "checks": {}
+        }
+
+    def wants(self, filename: str, ext: str) -> bool:
+        return ext in CONFIG_EXTENSIONS or filename in CONFIG_FILENAMES
+
+    def scan(self, rel_path: str, buffer: FileBuffer) -> List[Dict[str, Any]]:
+        return [{
+            "file": rel_path,
+            "issue": issue,
+            "severity": severity
+        } for regex, literals, issue, severity in COMPILED_CONFIG
+            if buffer.may_match(literals) and regex.search(buffer.text)]
+
+    def report(self, project_path: str) -> Dict[str, Any]:
+        results = self.results
+
+        # Check for security header configurations
+        header_files = ["next.config.js", "next.config.mjs", "middleware.ts", "nginx.conf"]
+        for hf in header_files:
+            hf_path = Path(project_path) / hf
+            if hf_path.exists():
+                results["checks"]["security_headers_config"] = True
+                break
+        else:
+            results["checks"]["security_headers_config"] = False
+            results["findings"].append({
+                "issue": "No security headers configuration found",
+                "severity": "medium",
+                "recommendation": "Configure CSP, HSTS, X-Frame-Options headers"
+            })
+
+        if any(f["severity"] == "critical" for f in results["findings"]):
+            results["status"] = "[!!] CRITICAL: Configuration issues"
+        elif any(f["severity"] == "high" for f in results["findings"]):
+            results["status"] = "[!] HIGH: Configuration review needed"
+        elif results["findings"]:
+            results["status"] = "[?] Minor configuration issues"
+
+        return results
+
+
+# Registered file scanners, in report order
+FILE_SCANNERS = [SecretScanner, PatternScanner, ConfigScanner]
+# Stateless instances used by scan_file(), in this process or a worker
+_SCANNERS_BY_KEY = {cls.key: cls() for cls in FILE_SCANNERS}
+
+
+def decode_text(raw: bytes) -> str:
+    """
+    Decode file bytes the way open(..., 'r', errors='ignore') would
+    (UTF-8, universal newlines).
+    """
+    content = raw.decode('utf-8', errors='ignore')
+    if "\r" in content:
+        content = content.replace("\r\n", "\n").replace("\r", "\n")
+    return content
+
+
+def _cache_file(project_path: str) -> Path:
+    """Location of the scan cache for a project directory."""
+    abs_path = os.path.abspath(project_path)
+    digest = hashlib.sha1(abs_path.encode('utf-8', errors='replace')).hexdigest()[:16]
+    return CACHE_DIR / f"{os.path.basename(abs_path) or 'root'}-{digest}.json"
+
+
+def load_scan_cache(project_path: str) -> Dict[str, list]:
+    """
+    Entries of the last cached scan of a project:
+    {rel_path: [sha1 of the content, {scanner key: findings}]}.
+    Empty if there is none or it was made with other rule tables.
+    """
+    try:
+        with open(_cache_file(project_path), 'r', encoding='utf-8') as f:
+            payload = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("rules") != RULES_DIGEST \
+            or not isinstance(payload.get("files"), dict):
+        return {}
+    return payload["files"]
+
+
+def save_scan_cache(project_path: str, entries: Dict[str, list]) -> None:
+    """Persist scan cache entries atomically; failures only cost a rescan next time."""
+    cache_file = _cache_file(project_path)
+    tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"rules": RULES_DIGEST, "files": entries}, f, separators=(",", ":"))
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        try:
+            tmp_file.unlink()
+        except OSError:
+            pass
+
+
+def file_digest(filepath: str) -> Optional[Tuple[int, str]]:
+    """(size in bytes, sha1 of the content) of a file, or None if it cannot be read."""
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+    except Exception:
+        return None
+    return len(raw), hashlib.sha1(raw).hexdigest()
+
+
+def scan_file(filepath: str, rel_path: str, keys: List[str]) -> Optional[Tuple[int, str, Dict[str, list]]]:
+    """
+    Read one file and run the scanners named by `keys` on it.
+    Returns (size in bytes, sha1 of the content, {key: findings}), or None
+    if it cannot be read.
+    """
+    try:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+    except Exception:
+        return None
+    buffer = FileBuffer(decode_text(raw))
+    findings = {}
+    for key in keys:
+        try:
+            findings[key] = _SCANNERS_BY_KEY[key].scan(rel_path, buffer)
+        except Exception:
+            findings[key] = []
+    return len(raw), hashlib.sha1(raw).hexdigest(), findings
+
+
+def _scan_batch(batch: List[tuple]) -> list:
+    """scan_file() over a batch of work items (runs in --jobs workers)."""
+    return [scan_file(*item) for item in batch]
+
+
+def scan_files(project_path: str, scanners: List[FileScanner], stats: Dict[str, Any] = None,
+               jobs: int = 1, cache: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Walk the project once, read every file claimed by at least one scanner
+    and hand the contents to each claiming scanner.
+    With jobs > 1 the files are scanned in batches on a process pool; the
+    walk is sorted and findings are merged in walk order, so the report is
+    the same for any job count.
+    With cache, every file is hashed first and the findings of files whose
+    content is unchanged since the last cached scan are replayed; size and
+    mtime are never trusted on their own (cp -p, rsync -t and tar keep them).
+    Returns {scanner.name: report}; `stats`, if given, receives the number
+    of files and bytes read (replayed files count once, for their hash), of
+    files replayed from the cache, the job count used and the scan time.
+    """
+    start = time.perf_counter()
+    previous = load_scan_cache(project_path) if cache else {}
+    work = []  # (filepath, rel_path, scanner keys) in walk order
     for root, dirs, files in os.walk(project_path):
-        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
-        
-        for file in files:
-            ext = Path(file).suffix.lower()
-            if ext not in CONFIG_EXTENSIONS and file not in ['next.config.js', 'webpack.config.js', '.eslintrc.js']:
+        dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+
+        for file in sorted(files):
+            ext = os.path.splitext(file)[1].lower()
+            # Every scanner sees every file so its own counters stay exact
+            keys = [scanner.key for scanner in scanners if scanner.wants(file, ext)]
+            if keys:
+                filepath = os.path.join(root, file)
+                work.append((filepath, os.path.relpath(filepath, project_path), keys))
+
+    # Cache entry per work item; files without a valid one are scanned
+    entries = [None] * len(work)
+    pending = []
+    files_read = bytes_read = files_cached = 0
+    for index, (filepath, rel_path, keys) in enumerate(work):
+        entry = previous.get(rel_path)
+        if entry is not None and all(key in entry[1] for key in keys):
+            digest = file_digest(filepath)
+            if digest is None:
                 continue
-                
-            filepath = Path(root) / file
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
-                    content = f.read()
-                    
-                    for pattern, issue, severity in config_issues:
-                        if re.search(pattern, content, re.IGNORECASE):
-                            results["findings"].append({
-                                "file": str(filepath.relative_to(project_path)),
-                                "issue": issue,
-                                "severity": severity
-                            })
-                            
-            except Exception:
-                pass
-    
-    # Check for security header configurations
-    header_files = ["next.config.js", "next.config.mjs", "middleware.ts", "nginx.conf"]
-    for hf in header_files:
-        hf_path = Path(project_path) / hf
-        if hf_path.exists():
-            results["checks"]["security_headers_config"] = True
-            break
+            if digest[1] == entry[0]:
+                entries[index] = entry
+                files_read += 1
+                bytes_read += digest[0]
+                files_cached += 1
+                continue
+        pending.append((index, (filepath, rel_path, keys)))
+
+    batches = [pending[i:i + JOB_BATCH_FILES] for i in range(0, len(pending), JOB_BATCH_FILES)]
+    jobs = max(1, min(jobs, len(batches)))
+    work_items = ([item for _, item in batch] for batch in batches)
+    pool = Pool(jobs) if jobs > 1 else None
+    results = pool.imap(_scan_batch, work_items) if pool else map(_scan_batch, work_items)
+
+    try:
+        for batch, scanned_batch in zip(batches, results):
+            for (index, (_, rel_path, _)), scanned in zip(batch, scanned_batch):
+                if scanned is None:
+                    continue
+                nbytes, content_digest, findings = scanned
+                files_read += 1
+                bytes_read += nbytes
+                entry = previous.get(rel_path)
+                if entry is not None and entry[0] == content_digest:
+                    # Keep findings of scanners that did not run this time
+                    findings = dict(entry[1], **findings)
+                entries[index] = [content_digest, findings]
+    except BaseException:
+        # Errors and Ctrl-C must not wait for the queued batches
+        if pool:
+            pool.terminate()
+        raise
     else:
-        results["checks"]["security_headers_config"] = False
-        results["findings"].append({
-            "issue": "No security headers configuration found",
-            "severity": "medium",
-            "recommendation": "Configure CSP, HSTS, X-Frame-Options headers"
-        })
-    
-    if any(f["severity"] == "critical" for f in results["findings"]):
-        results["status"] = "[!!] CRITICAL: Configuration issues"
-    elif any(f["severity"] == "high" for f in results["findings"]):
-        results["status"] = "[!] HIGH: Configuration review needed"
-    elif results["findings"]:
-        results["status"] = "[?] Minor configuration issues"
-    
-    return results
+        if pool:
+            pool.close()
+    finally:
+        if pool:
+            pool.join()
+
+    by_key = {scanner.key: scanner for scanner in scanners}
+    for (_, _, keys), entry in zip(work, entries):
+        if entry is not None:
+            for key in keys:
+                by_key[key].add(entry[1][key])
+
+    if cache:
+        current = {item[1]: entry for item, entry in zip(work, entries) if entry is not None}
+        # Files this scan type does not claim keep their entries while they exist
+        for rel_path, entry in previous.items():
+            if rel_path not in current and os.path.isfile(os.path.join(project_path, rel_path)):
+                current[rel_path] = entry
+        save_scan_cache(project_path, current)
+    if stats is not None:
+        stats.update(files_read=files_read, bytes_read=bytes_read, files_cached=files_cached,
+                     jobs=jobs, seconds=time.perf_counter() - start)
+    return {scanner.name: scanner.report(project_path) for scanner in scanners}
+
+
+def scan_secrets(project_path: str) -> Dict[str, Any]:
+    """Secret scan on its own (see SecretScanner)."""
+    return scan_files(project_path, [SecretScanner()])["secrets"]
+
+
+def scan_code_patterns(project_path: str) -> Dict[str, Any]:
+    """Dangerous code pattern scan on its own (see PatternScanner)."""
+    return scan_files(project_path, [PatternScanner()])["code_patterns"]
+
+
+def scan_configuration(project_path: str) -> Dict[str, Any]:
+    """Configuration scan on its own (see ConfigScanner)."""
+    return scan_files(project_path, [ConfigScanner()])["configuration"]
 
 
 # ============================================================================
 #  MAIN
 # ============================================================================
 
-def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
+def run_full_scan(project_path: str, scan_type: str = "all", jobs: int = 1,
+                  cache: bool = False) -> Dict[str, Any]:
     """Execute security validation scans."""
     
     report = {
@@ -385,28 +865,35 @@ def run_full_scan(project_path: str, scan_type: str = "all") -> Dict[str, Any]:
         }
     }
     
-    scanners = {
-        "deps": ("dependencies", scan_dependencies),
-        "secrets": ("secrets", scan_secrets),
-        "patterns": ("code_patterns", scan_code_patterns),
-        "config": ("configuration", scan_configuration),
-    }
-    
-    for key, (name, scanner) in scanners.items():
-        if scan_type == "all" or scan_type == key:
-            result = scanner(project_path)
-            report["scans"][name] = result
-            
-            findings_count = len(result.get("findings", []))
-            report["summary"]["total_findings"] += findings_count
-            
-            for finding in result.get("findings", []):
-                sev = finding.get("severity", "low")
-                if sev == "critical":
-                    report["summary"]["critical"] += 1
-                elif sev == "high":
-                    report["summary"]["high"] += 1
-    
+    if scan_type in ("all", "deps"):
+        report["scans"]["dependencies"] = scan_dependencies(project_path)
+
+    # All file-based scans share one walk and one read per file
+    file_scanners = [cls() for cls in FILE_SCANNERS if scan_type in ("all", cls.key)]
+    if file_scanners:
+        stats = {}
+        report["scans"].update(scan_files(project_path, file_scanners, stats, jobs, cache))
+        seconds = stats["seconds"]
+        report["performance"] = {
+            "files_read": stats["files_read"],
+            "bytes_read": stats["bytes_read"],
+            "files_cached": stats["files_cached"],
+            "jobs": stats["jobs"],
+            "seconds": round(seconds, 3),
+            "mb_per_s": round(stats["bytes_read"] / 1e6 / seconds, 2) if seconds else None,
+        }
+
+    for result in report["scans"].values():
+        findings_count = len(result.get("findings", []))
+        report["summary"]["total_findings"] += findings_count
+
+        for finding in result.get("findings", []):
+            sev = finding.get("severity", "low")
+            if sev == "critical":
+                report["summary"]["critical"] += 1
+            elif sev == "high":
+                report["summary"]["high"] += 1
+
     # Determine overall status
     if report["summary"]["critical"] > 0:
         report["summary"]["overall_status"] = "[!!] CRITICAL ISSUES FOUND"
@@ -427,6 +914,10 @@ def main():
                         default="all", help="Type of scan to run")
     parser.add_argument("--output", choices=["json", "summary"], default="json",
                         help="Output format")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                        help="Worker processes for file scans (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Rescan every file instead of replaying unchanged files from the scan cache")
     
     args = parser.parse_args()
     
@@ -434,7 +925,7 @@ def main():
         print(json.dumps({"error": f"Directory not found: {args.project_path}"}))
         sys.exit(1)
     
-    result = run_full_scan(args.project_path, args.scan_type)
+    result = run_full_scan(args.project_path, args.scan_type, args.jobs, cache=not args.no_cache)
     
     if args.output == "summary":
         print(f"\n{'='*60}")
@@ -444,6 +935,11 @@ def main():
         print(f"Total Findings: {result['summary']['total_findings']}")
         print(f"  Critical: {result['summary']['critical']}")
         print(f"  High: {result['summary']['high']}")
+        perf = result.get("performance")
+        if perf:
+            print(f"Scanned: {perf['files_read']} files, {perf['bytes_read'] / 1e6:.1f} MB "
+                  f"in {perf['seconds']:.2f}s ({perf['mb_per_s']} MB/s, {perf['jobs']} jobs, "
+                  f"{perf['files_cached']} files from cache)")
         print(f"{'='*60}\n")
         
         for scan_name, scan_result in result['scans'].items():
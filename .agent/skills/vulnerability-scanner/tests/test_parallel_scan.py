@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+security_scan.py --jobs: reports must be byte-identical for any job count.
+
+Run: python -m unittest discover -s .agent/skills/vulnerability-scanner/tests
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import security_scan  # noqa: E402
+
+# Sample findings are split into fragments so that scanning this repository
+# does not report the test's own fixtures
+SOURCES = {
+    "py": "".join(['import pick', 'le\nAPI_KEY = "sk_', 'live_0123456789abcdefghijklmn"\n',
+                   'result = ev', 'al(user_input)\ndata = pick', 'le.loads(blob)\n',
+                   'os.sys', 'tem("rm " + path)\n']),
+    "js": "".join(['el.inner', 'HTML = userInput;\nconst pass', 'word = "hunter2hunter2";\n',
+                   'child_process.ex', 'ec(cmd);\ndocument.wr', 'ite(html);\n']),
+    "json": "".join(['{"debug": true, "cors": {"origin": "*"}, "aws_secret": "AK', 'IAABCDEFGHIJKLMNOP"}\n']),
+}
+
+
+def build_tree(root: Path, dirs: int = 9, files_per_dir: int = 12):
+    """Nested tree with findings scattered over many files and batches."""
+    for d in range(dirs):
+        directory = root / f"pkg{d % 3}" / f"mod{d}"
+        directory.mkdir(parents=True)
+        for f in range(files_per_dir):
+            ext = ("py", "js", "json")[(d + f) % 3]
+            clean = (d * files_per_dir + f) % 4 == 0
+            body = f"value_{d}_{f} = {f}\n" if clean else SOURCES[ext] * (1 + f % 3)
+            (directory / f"file{f}.{ext}").write_text(f"# {d}/{f}\n" + body, encoding="utf-8")
+    (root / "next.config.js").write_text("module.exports = { poweredByHeader: true }\n", encoding="utf-8")
+
+
+class ParallelScanTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls._tmp = tempfile.TemporaryDirectory()
+        cls.root = cls._tmp.name
+        build_tree(Path(cls.root))
+        # Small batches so every job count gets several work items
+        cls._batch = security_scan.JOB_BATCH_FILES
+        security_scan.JOB_BATCH_FILES = 5
+
+    @classmethod
+    def tearDownClass(cls):
+        security_scan.JOB_BATCH_FILES = cls._batch
+        cls._tmp.cleanup()
+
+    def _report(self, scan_type: str, jobs: int) -> str:
+        report = security_scan.run_full_scan(self.root, scan_type, jobs=jobs)
+        report.pop("timestamp")
+        performance = report.pop("performance")
+        self.assertEqual(performance["jobs"], jobs)
+        return json.dumps(report, indent=2)
+
+    def test_reports_identical_across_job_counts(self):
+        for scan_type in ("all", "secrets", "patterns", "config"):
+            with self.subTest(scan_type=scan_type):
+                serial = self._report(scan_type, 1)
+                self.assertIn('"file"', serial)  # the tree does produce findings
+                for jobs in (2, 4):
+                    self.assertEqual(serial, self._report(scan_type, jobs), f"jobs={jobs}")
+
+
+if __name__ == "__main__":
+    unittest.main()